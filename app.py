@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import re
 from typing import Dict, List
 
 import streamlit as st
 
-from modules.agent_base import ContentBlock, ContentBlockType, DocumentPayload
+from modules.agent_base import (
+    ContentBlock,
+    ContentBlockType,
+    DocumentPayload,
+    LLMRewriteAgent,
+)
 from modules.config import AppConfig, ContentProfile, OptimizationMode
 from modules.content_strategist import ContentStrategistAgent
 from modules.chunk_optimizer import ChunkOptimizerAgent
@@ -20,31 +27,47 @@ st.set_page_config(
     layout="wide",
 )
 
+# Every boundary str.splitlines() honours, folded to "\n" so LINE_RE (whose
+# ^/$ only know "\n") sees the same lines.
+LINE_BREAK_RE = re.compile(r"\r\n|[\r\v\f\x1c-\x1e\x85\u2028\u2029]")
+
+# One match per line: optional "#"-"###" marker followed by a space, then the
+# line text with surrounding whitespace trimmed, without splitting first.
+LINE_RE = re.compile(
+    r"^[^\S\n]*(?:(#{1,3}) (?=[^\n]*\S))?([^\n]*?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
+HEADING_LEVELS = {
+    1: ContentBlockType.H1,
+    2: ContentBlockType.H2,
+    3: ContentBlockType.H3,
+}
+
+
+@st.cache_data(show_spinner=False)
+def decode_upload(data: bytes) -> str:
+    return data.decode("utf-8")
+
 
+@st.cache_data(show_spinner=False)
 def parse_blocks(raw_text: str) -> List[ContentBlock]:
     blocks: List[ContentBlock] = []
     block_id = 0
-    for line in raw_text.splitlines():
-        stripped = line.strip()
-        if not stripped:
+    for match in LINE_RE.finditer(LINE_BREAK_RE.sub("\n", raw_text)):
+        hashes, text = match.groups()
+        if not text:
             continue
         block_type = ContentBlockType.PARAGRAPH
         metadata: Dict[str, str] = {}
-        if stripped.startswith("### "):
-            block_type = ContentBlockType.H3
-            stripped = stripped[4:]
-        elif stripped.startswith("## "):
-            block_type = ContentBlockType.H2
-            stripped = stripped[3:]
-        elif stripped.startswith("# "):
-            block_type = ContentBlockType.H1
-            stripped = stripped[2:]
+        if hashes:
+            block_type = HEADING_LEVELS[len(hashes)]
         block_id += 1
         blocks.append(
             ContentBlock(
                 block_id=str(block_id),
                 type=block_type,
-                text=stripped,
+                text=text,
                 metadata=metadata,
             )
         )
@@ -65,8 +88,55 @@ def build_document(
     )
 
 
-def run_pipeline(document: DocumentPayload, config: AppConfig):
-    llm_client = OpenRouterClient(config)
+# The AppConfig fields OpenRouterClient reads; profile and mode changes
+# between runs keep the same client.
+CLIENT_FIELDS = {
+    "selected_model",
+    "openrouter",
+    "max_concurrent_llm_calls",
+    "cache_enabled",
+    "cache_max_entries",
+    "semantic_cache_enabled",
+    "semantic_cache_threshold",
+}
+
+
+@st.cache_resource(
+    show_spinner=False,
+    hash_funcs={
+        AppConfig: lambda config: config.model_dump_json(include=CLIENT_FIELDS)
+    },
+)
+def get_llm_client(config: AppConfig) -> OpenRouterClient:
+    # One client per client setting so repeat runs reuse its HTTP/2
+    # connections.
+    return OpenRouterClient(config)
+
+
+async def run_stage(agent, document: DocumentPayload, placeholder):
+    running = f"Running {agent.stage_name}..."
+    placeholder.write(running)
+    rewrites = isinstance(agent, LLMRewriteAgent)
+    if rewrites:
+        # Streamed rewrites render under the stage's line as tokens arrive.
+        agent.preview = lambda text: placeholder.markdown(f"{running}\n\n{text}")
+    result = await agent.run_async(document)
+    if rewrites:
+        agent.preview = None
+    placeholder.write(
+        f"{agent.stage_name} · Gate: {result.decision.value.upper()}"
+    )
+    return result
+
+
+async def run_pipeline_async(
+    document: DocumentPayload,
+    config: AppConfig,
+    llm_client: OpenRouterClient,
+):
+    # Every stage rewrites the previous stage's output (AEC chunks, then SVO
+    # sentences, then citations), so the stages run in order; the LLM calls
+    # within a stage are what run concurrently.
     agents = [
         ContentStrategistAgent(config, llm_client),
         ChunkOptimizerAgent(config, llm_client),
@@ -74,21 +144,32 @@ def run_pipeline(document: DocumentPayload, config: AppConfig):
         AuthorityBuilderAgent(config, llm_client),
         MetadataOptimizerAgent(config),
     ]
+
+    # Each stage's merged blocks replace the document's in place rather than
+    # rebuilding the payload between stages.
     results = []
     current_doc = document
-    for agent in agents:
-        with st.spinner(f"Running {agent.stage_name}..."):
-            result = agent.run(current_doc)
-            current_doc = DocumentPayload(
-                raw_text=current_doc.raw_text,
-                blocks=result.optimized_blocks,
-                profile=current_doc.profile,
-                metadata=current_doc.metadata,
-            )
+    with st.status("Running optimization pipeline...", expanded=True) as status:
+        # One line per stage, updated as soon as that stage resolves.
+        placeholders = [st.empty() for _ in agents]
+        for agent, placeholder in zip(agents, placeholders):
+            result = await run_stage(agent, current_doc, placeholder)
+            current_doc.blocks = result.optimized_blocks
             results.append(result)
+        status.update(label="Optimization complete", state="complete")
     return results, current_doc
 
 
+def run_pipeline(document: DocumentPayload, config: AppConfig):
+    llm_client = get_llm_client(config)
+    # The client's connection pool outlives this run; only the cache needs
+    # flushing, including when a stage raises.
+    try:
+        return asyncio.run(run_pipeline_async(document, config, llm_client))
+    finally:
+        llm_client.save_cache()
+
+
 def render_feedback(results):
     for result in results:
         title = f"{result.stage_name} · Gate: {result.decision.value.upper()}"
@@ -104,6 +185,21 @@ def render_feedback(results):
                 )
 
 
+@st.fragment
+def render_final_blocks():
+    final_doc = st.session_state.get("final_doc")
+    if final_doc is None:
+        return
+    st.subheader("Optimized Blocks")
+    # A single markdown element instead of one per block.
+    st.markdown(
+        "\n\n".join(
+            f"**{block.type.value}:** {block.text}"
+            for block in final_doc.blocks
+        )
+    )
+
+
 def main():
     st.title("AI Content Optimization Orchestrator")
 
@@ -133,10 +229,16 @@ def main():
             ],
             index=3,
         )
+        cache_enabled = st.checkbox(
+            "Reuse cached LLM responses",
+            value=True,
+            help="Serve repeated prompts from the local cache.",
+        )
 
     config = AppConfig(
         profile=profile,
         mode=mode,
+        cache_enabled=cache_enabled,
     )
     config.selected_model = selected_model
 
@@ -161,7 +263,7 @@ def main():
     if st.button("Run Optimization", type="primary"):
         raw_content = ""
         if uploaded_file is not None:
-            raw_content = uploaded_file.read().decode("utf-8")
+            raw_content = decode_upload(uploaded_file.getvalue())
         elif raw_content_input.strip():
             raw_content = raw_content_input
         else:
@@ -180,10 +282,14 @@ def main():
         
         document = build_document(raw_content, profile, metadata)
         results, final_doc = run_pipeline(document, config)
-        render_feedback(results)
-        st.subheader("Optimized Blocks")
-        for block in final_doc.blocks:
-            st.markdown(f"**{block.type.value}:** {block.text}")
+        st.session_state["results"] = results
+        st.session_state["final_doc"] = final_doc
+
+    # Re-render the last run on every rerun so unrelated widget changes do
+    # not discard results or re-trigger the LLM pipeline.
+    if "results" in st.session_state:
+        render_feedback(st.session_state["results"])
+        render_final_blocks()
 
 
 if __name__ == "__main__":
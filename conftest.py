@@ -0,0 +1 @@
+"""Pytest root: puts the repository on ``sys.path`` for ``tests/``."""
@@ -2,13 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
+import sys
 from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    TypeVar,
+)
 
 from pydantic import BaseModel, Field
 
 from modules.config import AppConfig, ContentProfile
+from utils.llm_handler import (
+    JSON_OBJECT_FORMAT,
+    ChatMessage,
+    OpenRouterClient,
+    build_batch_prompt,
+    parse_batch_rewrites,
+)
+from utils.text_scan import MAX_LLM_CHARS, split_for_llm
+
+T = TypeVar("T")
 
 
 class Severity(str, Enum):
@@ -34,27 +57,40 @@ class ContentBlockType(str, Enum):
     METADATA = "metadata"
 
 
-class ContentBlock(BaseModel):
+# Per-block models are slotted dataclasses so hot paths skip validation;
+# Pydantic stays at the configuration boundary.
+@dataclass(slots=True)
+class ContentBlock:
     block_id: str
     type: ContentBlockType
     text: str
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-class DocumentPayload(BaseModel):
+@dataclass(slots=True)
+class DocumentPayload:
     raw_text: str
     blocks: List[ContentBlock]
     profile: ContentProfile
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-class OptimizationFeedback(BaseModel):
+@dataclass(slots=True)
+class OptimizationFeedback:
     element_identified: str
     current_issue: str
     improvement_mandate: str
     optimized_version: str
     severity: Severity = Severity.MEDIUM
-    impact_score: int = Field(50, ge=0, le=100)
+    impact_score: int = 50
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.impact_score <= 100:
+            raise ValueError("impact_score must be between 0 and 100.")
+        # Labels such as "Paragraph 12" are rebuilt by every agent that flags
+        # the block; interning keeps one copy per distinct label.
+        self.element_identified = sys.intern(self.element_identified)
+        self.improvement_mandate = sys.intern(self.improvement_mandate)
 
 
 class AgentScore(BaseModel):
@@ -63,13 +99,31 @@ class AgentScore(BaseModel):
     rationale: Optional[str] = None
 
 
-class AgentPassResult(BaseModel):
-    feedback: List[OptimizationFeedback] = Field(default_factory=list)
-    optimized_blocks: List[ContentBlock] = Field(default_factory=list)
+@dataclass(slots=True)
+class AgentPassResult:
+    feedback: List[OptimizationFeedback] = field(default_factory=list)
+    optimized_blocks: List[ContentBlock] = field(default_factory=list)
     score_delta: int = 0
-
-
-class AgentResult(BaseModel):
+    # Slotted dataclasses cannot use cached_property, so memoize by hand.
+    _block_ids: Optional[FrozenSet[str]] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    @property
+    def optimized_block_ids(self) -> FrozenSet[str]:
+        """Ids of the rewritten blocks, built once on first access."""
+        if self._block_ids is None:
+            self._block_ids = frozenset(
+                block.block_id for block in self.optimized_blocks
+            )
+        return self._block_ids
+
+
+@dataclass(slots=True)
+class AgentResult:
     stage_name: str
     decision: GateDecision
     score: AgentScore
@@ -78,10 +132,11 @@ class AgentResult(BaseModel):
     summary: Optional[str] = None
 
 
-class AgentContext(BaseModel):
+@dataclass(slots=True)
+class AgentContext:
     document: DocumentPayload
     config: AppConfig
-    notes: Dict[str, str] = Field(default_factory=dict)
+    notes: Dict[str, Any] = field(default_factory=dict)
 
 
 class OptimizationAgent(ABC):
@@ -96,7 +151,36 @@ class OptimizationAgent(ABC):
         context = AgentContext(document=payload, config=self.config)
         structural_pass = self.structural_pass(context)
         copy_pass = self.copy_pass(context, structural_pass)
+        return self._build_result(payload, structural_pass, copy_pass)
+
+    async def run_async(self, payload: DocumentPayload) -> AgentResult:
+        context = AgentContext(document=payload, config=self.config)
+        structural_pass = self.structural_pass(context)
+        copy_pass = await self.copy_pass_async(context, structural_pass)
+        return self._build_result(payload, structural_pass, copy_pass)
+
+    async def copy_pass_async(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> AgentPassResult:
+        """Run the copy layer without blocking the event loop.
+
+        Agents that talk to the LLM override this with a native coroutine;
+        everything else runs the sync pass in a worker thread.
+        """
+        return await asyncio.to_thread(
+            self.copy_pass,
+            context,
+            structural_result,
+        )
 
+    def _build_result(
+        self,
+        payload: DocumentPayload,
+        structural_pass: AgentPassResult,
+        copy_pass: AgentPassResult,
+    ) -> AgentResult:
         combined_feedback = structural_pass.feedback + copy_pass.feedback
         optimized_blocks = self._merge_blocks(
             payload.blocks,
@@ -141,14 +225,21 @@ class OptimizationAgent(ABC):
         structural: List[ContentBlock],
         copy: List[ContentBlock],
     ) -> List[ContentBlock]:
-        replacements = {
-            block.block_id: block
-            for block in structural + copy
-        }
-        merged = []
-        for block in original:
-            merged.append(replacements.get(block.block_id, block))
-        return merged
+        if not structural and not copy:
+            return original
+        replacements = {block.block_id: block for block in structural}
+        replacements.update((block.block_id, block) for block in copy)
+        return [replacements.get(block.block_id, block) for block in original]
+
+    def _memo(self, context: AgentContext, key: str, build: Callable[[], T]) -> T:
+        """Return ``context.notes[key]``, computing it with ``build`` once.
+
+        Both passes of an agent share one context, so per-document scans are
+        built by the structural pass and reused by the copy pass.
+        """
+        if key not in context.notes:
+            context.notes[key] = build()
+        return context.notes[key]
 
     def score_note(self, payload: DocumentPayload) -> str:
         return (
@@ -161,14 +252,7 @@ class OptimizationAgent(ABC):
         feedback: List[OptimizationFeedback],
         decision: GateDecision,
     ) -> str:
-        counts = {
-            Severity.CRITICAL: 0,
-            Severity.HIGH: 0,
-            Severity.MEDIUM: 0,
-            Severity.LOW: 0,
-        }
-        for item in feedback:
-            counts[item.severity] += 1
+        counts = Counter(item.severity for item in feedback)
         return (
             f"Decision: {decision.value}. Issues -> "
             f"Critical {counts[Severity.CRITICAL]}, "
@@ -188,3 +272,157 @@ class OptimizationAgent(ABC):
         structural_result: AgentPassResult,
     ) -> AgentPassResult:
         """Analyze paragraphs, sentences, and claims."""
+
+
+class LLMRewriteAgent(OptimizationAgent):
+    """Base for agents whose copy pass rewrites blocks through the LLM.
+
+    Subclasses supply the prompt via ``_messages``; batching, the per-text
+    fallback and over-long blocks are handled here.
+    """
+
+    # Set by the UI to show a single-text rewrite while its tokens arrive.
+    preview: Optional[Callable[[str], None]] = None
+
+    def __init__(
+        self,
+        config: AppConfig,
+        llm_client: Optional[OpenRouterClient] = None,
+    ) -> None:
+        super().__init__(config)
+        self.llm = llm_client
+
+    @abstractmethod
+    def _messages(self, text: str) -> List[ChatMessage]:
+        """Build the rewrite prompt for ``text`` (a block or a batch)."""
+
+    def _rewrite_blocks(self, blocks: List[ContentBlock]) -> List[str]:
+        """Rewrite each block's text, sending every distinct text once.
+
+        Over-long texts send only their head (see ``split_for_llm``) and get
+        their tail back unchanged.
+        """
+        parts = [split_for_llm(block.text) for block in blocks]
+        rewrites: Dict[str, str] = {}
+        for batch in self._batches(list(dict.fromkeys(h for h, _ in parts))):
+            rewrites.update(zip(batch, self._rewrite_batch(batch)))
+        return [self._join_tail(rewrites[head], tail) for head, tail in parts]
+
+    async def _rewrite_blocks_async(self, blocks: List[ContentBlock]) -> List[str]:
+        parts = [split_for_llm(block.text) for block in blocks]
+        batches = self._batches(list(dict.fromkeys(h for h, _ in parts)))
+        results = await asyncio.gather(
+            *(self._rewrite_batch_async(batch) for batch in batches)
+        )
+        rewrites = {
+            text: rewritten
+            for batch, batch_rewrites in zip(batches, results)
+            for text, rewritten in zip(batch, batch_rewrites)
+        }
+        return [self._join_tail(rewrites[head], tail) for head, tail in parts]
+
+    def _rewrite_batch(self, texts: List[str]) -> List[str]:
+        """Rewrite a batch in one request, falling back per text."""
+        if self.llm and len(texts) > 1:
+            response = self.llm.chat(
+                messages=self._messages(build_batch_prompt(texts)),
+                max_tokens=2048 * len(texts),
+                response_format=JSON_OBJECT_FORMAT,
+            )
+            rewrites = parse_batch_rewrites(response.content, len(texts))
+            if rewrites is not None:
+                return rewrites
+        return [self._rewrite_text(text) for text in texts]
+
+    async def _rewrite_batch_async(self, texts: List[str]) -> List[str]:
+        if self.llm and len(texts) > 1:
+            response = await self.llm.chat_async(
+                messages=self._messages(build_batch_prompt(texts)),
+                max_tokens=2048 * len(texts),
+                response_format=JSON_OBJECT_FORMAT,
+            )
+            rewrites = parse_batch_rewrites(response.content, len(texts))
+            if rewrites is not None:
+                return rewrites
+        return list(
+            await asyncio.gather(*(self._rewrite_text_async(t) for t in texts))
+        )
+
+    def _rewrite_text(self, text: str) -> str:
+        if not self.llm:
+            return text
+        response = self.llm.chat(messages=self._messages(text))
+        # An empty reply (e.g. max_tokens spent on reasoning) is a failed
+        # rewrite, not a request to delete the paragraph.
+        return response.content.strip() or text
+
+    async def _rewrite_text_async(self, text: str) -> str:
+        if not self.llm:
+            return text
+        response = await self.llm.chat_async(
+            messages=self._messages(text),
+            on_token=self._token_sink(),
+        )
+        return response.content.strip() or text
+
+    def _truncation_issue(
+        self,
+        block: ContentBlock,
+        element: str,
+    ) -> Optional[OptimizationFeedback]:
+        """Report that only the head of an over-long block was rewritten."""
+        if len(block.text) <= MAX_LLM_CHARS:
+            return None
+        head, tail = split_for_llm(block.text)
+        return OptimizationFeedback(
+            element_identified=element,
+            current_issue=(
+                f"Text exceeds {MAX_LLM_CHARS} characters; only its first "
+                f"{len(head)} characters were rewritten and the remainder "
+                "was kept unchanged."
+            ),
+            improvement_mandate=(
+                "Split the block upstream so every part can be optimized."
+            ),
+            optimized_version=tail.lstrip()[:200] + "...",
+            severity=Severity.LOW,
+            impact_score=60,
+        )
+
+    def _join_tail(self, rewritten: str, tail: str) -> str:
+        """Re-attach the part of an over-long block that was not sent."""
+        return f"{rewritten} {tail.lstrip()}" if tail else rewritten
+
+    def _token_sink(self) -> Optional[Callable[[str], None]]:
+        """Return an ``on_token`` callback that feeds ``preview``, if set.
+
+        Each call gets its own buffer, so concurrent rewrites never splice
+        their tokens together; the preview shows whichever updated last.
+        """
+        if self.preview is None:
+            return None
+        preview = self.preview
+        buffer = io.StringIO()
+
+        def on_token(token: str) -> None:
+            buffer.write(token)
+            preview(buffer.getvalue())
+
+        return on_token
+
+    def _limit_distinct(
+        self,
+        blocks: List[ContentBlock],
+        limit: int,
+    ) -> List[ContentBlock]:
+        """Keep blocks whose text is among the first ``limit`` distinct texts.
+
+        Repeated paragraphs (boilerplate CTAs, disclaimers) share one rewrite,
+        so they should not use up the per-pass LLM budget.
+        """
+        allowed = set(list(dict.fromkeys(block.text for block in blocks))[:limit])
+        return [block for block in blocks if block.text in allowed]
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        size = self.config.max_paras_per_batch
+        return [texts[start:start + size] for start in range(0, len(texts), size)]
@@ -3,42 +3,39 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
+from typing import Dict, List, Tuple
 
 from modules.agent_base import (
     AgentContext,
     AgentPassResult,
     ContentBlock,
     ContentBlockType,
-    OptimizationAgent,
+    LLMRewriteAgent,
     OptimizationFeedback,
     Severity,
 )
-from modules.config import AppConfig
-from utils.llm_handler import ChatMessage, OpenRouterClient
+from modules.style_guide import agent_messages
+from utils.llm_handler import ChatMessage
 
+# Group 1 marks an inline URL citation, group 2 a fresh (2020+) year.
+_AUTHORITY_RE = re.compile(r"(https?://)|(20(?:2[0-9]|3[0-9]))")
 
-class AuthorityBuilderAgent(OptimizationAgent):
+
+class AuthorityBuilderAgent(LLMRewriteAgent):
     """Injects citations, dates, and experience/E-E-A-T signals."""
 
     stage_name = "Stage 4 · Authority Builder"
 
-    def __init__(
-        self,
-        config: AppConfig,
-        llm_client: Optional[OpenRouterClient] = None,
-    ) -> None:
-        super().__init__(config)
-        self.llm = llm_client
-
     def structural_pass(self, context: AgentContext) -> AgentPassResult:
         feedback: List[OptimizationFeedback] = []
         optimized_blocks: List[ContentBlock] = []
+        flags = self._authority_flags(context)
 
         for block in context.document.blocks:
             if block.type != ContentBlockType.PARAGRAPH:
                 continue
-            if not self._has_citation(block.text):
+            has_citation, has_year = flags[block.block_id]
+            if not has_citation:
                 feedback.append(
                     self._issue(
                         element=f"Paragraph {block.block_id}",
@@ -48,7 +45,7 @@ class AuthorityBuilderAgent(OptimizationAgent):
                         severity=Severity.HIGH,
                     )
                 )
-            if not self._has_fresh_year(block.text):
+            if not has_year:
                 feedback.append(
                     self._issue(
                         element=f"Paragraph {block.block_id}",
@@ -71,42 +68,64 @@ class AuthorityBuilderAgent(OptimizationAgent):
         context: AgentContext,
         structural_result: AgentPassResult,
     ) -> AgentPassResult:
-        feedback: List[OptimizationFeedback] = []
-        optimized_blocks: List[ContentBlock] = []
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(candidates, self._rewrite_blocks(candidates))
+
+    async def copy_pass_async(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> AgentPassResult:
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(
+            candidates,
+            await self._rewrite_blocks_async(candidates),
+        )
 
+    def _rewrite_candidates(self, context: AgentContext) -> List[ContentBlock]:
         # Limit processing to avoid timeouts
-        processed_count = 0
         MAX_BLOCKS_TO_PROCESS = 5
+        flags = self._authority_flags(context)
+        candidates = [
+            block
+            for block in context.document.blocks
+            if block.type == ContentBlockType.PARAGRAPH
+            and not all(flags[block.block_id])
+        ]
+        return self._limit_distinct(candidates, MAX_BLOCKS_TO_PROCESS)
+
+    def _copy_result(
+        self,
+        candidates: List[ContentBlock],
+        rewrites: List[str],
+    ) -> AgentPassResult:
+        feedback: List[OptimizationFeedback] = []
+        optimized_blocks: List[ContentBlock] = []
 
-        for block in context.document.blocks:
-            if block.type != ContentBlockType.PARAGRAPH:
-                continue
-            
-            if self._needs_authority_upgrade(block.text):
-                if processed_count < MAX_BLOCKS_TO_PROCESS:
-                    rewritten = self._rewrite_authority(block.text)
-                    processed_count += 1
-
-                    optimized_blocks.append(
-                        ContentBlock(
-                            block_id=block.block_id,
-                            type=block.type,
-                            text=rewritten,
-                            metadata=block.metadata,
-                        )
-                    )
-                    feedback.append(
-                        self._issue(
-                            element=f"Paragraph {block.block_id}",
-                            issue="Paragraph lacks explicit E-E-A-T markers.",
-                            mandate="Add data-backed citation, date, and first-hand signal (e.g., 'In our audits...').",
-                            optimized=rewritten,
-                            severity=Severity.HIGH,
-                        )
-                    )
-                else:
-                    # Skip optimization if limit reached
-                    pass
+        for block, rewritten in zip(candidates, rewrites):
+            optimized_blocks.append(
+                ContentBlock(
+                    block_id=block.block_id,
+                    type=block.type,
+                    text=rewritten,
+                    metadata=block.metadata,
+                )
+            )
+            feedback.append(
+                self._issue(
+                    element=f"Paragraph {block.block_id}",
+                    issue="Paragraph lacks explicit E-E-A-T markers.",
+                    mandate="Add data-backed citation, date, and first-hand signal (e.g., 'In our audits...').",
+                    optimized=rewritten,
+                    severity=Severity.HIGH,
+                )
+            )
+            truncated = self._truncation_issue(
+                block,
+                f"Paragraph {block.block_id}",
+            )
+            if truncated is not None:
+                feedback.append(truncated)
 
         score_delta = max(0, 80 - 10 * len(feedback))
         return AgentPassResult(
@@ -115,30 +134,42 @@ class AuthorityBuilderAgent(OptimizationAgent):
             score_delta=score_delta,
         )
 
-    def _has_citation(self, text: str) -> bool:
-        return bool(re.search(r"https?://", text))
-
-    def _has_fresh_year(self, text: str) -> bool:
-        return bool(re.search(r"20(2[0-9]|3[0-9])", text))
-
-    def _needs_authority_upgrade(self, text: str) -> bool:
-        return not (self._has_citation(text) and self._has_fresh_year(text))
+    def _scan_authority(self, text: str) -> Tuple[bool, bool]:
+        """Return ``(has_citation, has_fresh_year)`` from a single scan."""
+        # Cheap substring prefilter: most prose has neither a URL nor a year.
+        if "http" not in text and "20" not in text:
+            return False, False
+        has_citation = has_year = False
+        for match in _AUTHORITY_RE.finditer(text):
+            if match.group(1):
+                has_citation = True
+            else:
+                has_year = True
+            if has_citation and has_year:
+                break
+        return has_citation, has_year
+
+    def _authority_flags(
+        self,
+        context: AgentContext,
+    ) -> Dict[str, Tuple[bool, bool]]:
+        return self._memo(
+            context,
+            "authority_flags",
+            lambda: {
+                block.block_id: self._scan_authority(block.text)
+                for block in context.document.blocks
+                if block.type == ContentBlockType.PARAGRAPH
+            },
+        )
 
-    def _rewrite_authority(self, text: str) -> str:
-        if not self.llm:
-            return text
+    def _messages(self, text: str) -> List[ChatMessage]:
         prompt = (
             "Strengthen this paragraph with: 1) an explicit source + URL, 2) a "
             "publication year, and 3) a first-hand/experience statement. Keep "
             "tone factual and cite reputable domains (.gov/.edu/.org)."
         )
-        response = self.llm.chat(
-            messages=[
-                ChatMessage(role="system", content="You add authoritative citations."),
-                ChatMessage(role="user", content=f"{prompt}\n\n{text}"),
-            ]
-        )
-        return response.content.strip()
+        return agent_messages("You add authoritative citations.", prompt, text)
 
     def _issue(
         self,
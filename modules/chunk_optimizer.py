@@ -2,44 +2,36 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List
 
 from modules.agent_base import (
     AgentContext,
     AgentPassResult,
     ContentBlock,
     ContentBlockType,
-    OptimizationAgent,
+    LLMRewriteAgent,
     OptimizationFeedback,
     Severity,
 )
-from modules.config import AppConfig
-from utils.llm_handler import ChatMessage, OpenRouterClient
+from modules.style_guide import agent_messages
+from utils.llm_handler import ChatMessage
 
 MIN_CHUNK = 75
 MAX_CHUNK = 250
 
 
-class ChunkOptimizerAgent(OptimizationAgent):
+class ChunkOptimizerAgent(LLMRewriteAgent):
     """Rebuilds body copy into AI-extractable semantic chunks."""
 
     stage_name = "Stage 2 · Chunk Optimizer"
 
-    def __init__(
-        self,
-        config: AppConfig,
-        llm_client: Optional[OpenRouterClient] = None,
-    ) -> None:
-        super().__init__(config)
-        self.llm = llm_client
-
     def structural_pass(self, context: AgentContext) -> AgentPassResult:
         feedback: List[OptimizationFeedback] = []
         optimized_blocks: List[ContentBlock] = []
 
-        chunks = self._collect_chunks(context.document.blocks)
+        chunks = self._chunks(context)
         for chunk in chunks:
-            word_count = len(chunk.text.split())
+            word_count = self._word_count_capped(chunk.text, MAX_CHUNK)
             if word_count < MIN_CHUNK:
                 feedback.append(
                     self._issue(
@@ -72,42 +64,61 @@ class ChunkOptimizerAgent(OptimizationAgent):
         context: AgentContext,
         structural_result: AgentPassResult,
     ) -> AgentPassResult:
-        feedback: List[OptimizationFeedback] = []
-        optimized_blocks: List[ContentBlock] = []
-        chunks = self._collect_chunks(context.document.blocks)
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(candidates, self._rewrite_blocks(candidates))
+
+    async def copy_pass_async(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> AgentPassResult:
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(
+            candidates,
+            await self._rewrite_blocks_async(candidates),
+        )
+
+    def _rewrite_candidates(self, context: AgentContext) -> List[ContentBlock]:
+        chunks = self._chunks(context)
 
         # Limit the number of chunks processed to avoid timeouts
-        # Process only the first 5 chunks that fail the AEC check
-        processed_count = 0
+        # Process only the first 5 distinct chunks that fail the AEC check
         MAX_CHUNKS_TO_PROCESS = 5
+        failing = [chunk for chunk in chunks if not self._passes_aec(chunk.text)]
+        return self._limit_distinct(failing, MAX_CHUNKS_TO_PROCESS)
 
-        for chunk in chunks:
-            if not self._passes_aec(chunk.text):
-                if processed_count < MAX_CHUNKS_TO_PROCESS:
-                    rewritten = self._rewrite_chunk(chunk.text)
-                    processed_count += 1
-                    
-                    optimized_blocks.append(
-                        ContentBlock(
-                            block_id=chunk.block_id,
-                            type=chunk.type,
-                            text=rewritten,
-                            metadata=chunk.metadata,
-                        )
-                    )
-                    feedback.append(
-                        self._issue(
-                            element=f"Chunk {chunk.metadata.get('h2_label', 'N/A')}",
-                            issue="Chunk does not follow Answer→Evidence→Context style.",
-                            mandate="Rewrite chunk so first sentence answers, middle cites data, last sentence explains relevance.",
-                            optimized=rewritten,
-                            severity=Severity.HIGH,
-                        )
-                    )
-                else:
-                    # If we hit the limit, just keep the original chunk but maybe add a note
-                    # For now, we just don't optimize it to save time
-                    pass
+    def _copy_result(
+        self,
+        candidates: List[ContentBlock],
+        rewrites: List[str],
+    ) -> AgentPassResult:
+        feedback: List[OptimizationFeedback] = []
+        optimized_blocks: List[ContentBlock] = []
+
+        for chunk, rewritten in zip(candidates, rewrites):
+            optimized_blocks.append(
+                ContentBlock(
+                    block_id=chunk.block_id,
+                    type=chunk.type,
+                    text=rewritten,
+                    metadata=chunk.metadata,
+                )
+            )
+            feedback.append(
+                self._issue(
+                    element=f"Chunk {chunk.metadata.get('h2_label', 'N/A')}",
+                    issue="Chunk does not follow Answer→Evidence→Context style.",
+                    mandate="Rewrite chunk so first sentence answers, middle cites data, last sentence explains relevance.",
+                    optimized=rewritten,
+                    severity=Severity.HIGH,
+                )
+            )
+            truncated = self._truncation_issue(
+                chunk,
+                f"Chunk {chunk.metadata.get('h2_label', 'N/A')}",
+            )
+            if truncated is not None:
+                feedback.append(truncated)
 
         score_delta = max(0, 80 - 10 * len(feedback))
         return AgentPassResult(
@@ -119,6 +130,13 @@ class ChunkOptimizerAgent(OptimizationAgent):
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    def _chunks(self, context: AgentContext) -> List[ContentBlock]:
+        return self._memo(
+            context,
+            "chunks",
+            lambda: self._collect_chunks(context.document.blocks),
+        )
+
     def _collect_chunks(self, blocks: List[ContentBlock]) -> List[ContentBlock]:
         chunks: List[ContentBlock] = []
         current_h2 = None
@@ -139,27 +157,35 @@ class ChunkOptimizerAgent(OptimizationAgent):
                 )
         return chunks
 
+    def _word_count_capped(self, text: str, cap: int) -> int:
+        """Count words, stopping at ``cap + 1`` so long chunks stay cheap."""
+        return len(text.split(None, cap))
+
     def _passes_aec(self, text: str) -> bool:
-        sentences = [s.strip() for s in text.split(".") if s.strip()]
-        if len(sentences) < 3:
-            return False
-        return True
-
-    def _rewrite_chunk(self, text: str) -> str:
-        if not self.llm:
-            return text
+        # Count non-empty "."-separated segments, stopping at the third.
+        count = 0
+        pos = 0
+        while count < 3:
+            end = text.find(".", pos)
+            segment = text[pos:] if end == -1 else text[pos:end]
+            if segment.strip():
+                count += 1
+            if end == -1:
+                break
+            pos = end + 1
+        return count >= 3
+
+    def _messages(self, text: str) -> List[ChatMessage]:
         prompt = (
             "Rewrite the chunk using Answer→Evidence→Context. First sentence must "
             "answer the H2 question directly, next 2-3 sentences cite data or logic, "
             "final sentence explains why it matters."
         )
-        response = self.llm.chat(
-            messages=[
-                ChatMessage(role="system", content="You optimize chunks for AI extraction."),
-                ChatMessage(role="user", content=f"{prompt}\n\n{text}"),
-            ]
+        return agent_messages(
+            "You optimize chunks for AI extraction.",
+            prompt,
+            text,
         )
-        return response.content.strip()
 
     def _issue(
         self,
@@ -1,7 +1,8 @@
 """Configuration primitives for the AI Content Optimizer framework."""
 
 from enum import Enum
-from typing import List
+from functools import lru_cache
+from typing import Any, Dict, List
 from pydantic import BaseModel, Field
 
 # -- Content Profiles & Modes -------------------------------------------------
@@ -22,59 +23,84 @@ class OptimizationMode(str, Enum):
 
 # -- OpenRouter Model Catalog -------------------------------------------------
 # Users will provide an `OPENROUTER_API_KEY` via Streamlit Secrets and can pick
-# any of the models below at runtime.
+# any of the models below at runtime. `providers` pins OpenRouter routing to
+# the listed upstreams (in order) so repeat calls land on the same prompt
+# cache; `cache_control` marks models that need explicit cache breakpoints.
 OPENROUTER_MODELS = [
     {
         "id": "openai/gpt-5.1",
         "label": "OpenAI GPT-5.1",
         "tier": "premium",
+        "providers": ["openai"],
+        "cache_control": False,
     },
     {
         "id": "openai/gpt-4.1-mini",
         "label": "OpenAI GPT-4.1 Mini",
         "tier": "balanced",
+        "providers": ["openai"],
+        "cache_control": False,
     },
     {
         "id": "anthropic/claude-sonnet-4.5",
         "label": "Anthropic Claude Sonnet 4.5",
         "tier": "premium",
+        "providers": ["anthropic"],
+        "cache_control": True,
     },
     {
         "id": "google/gemini-3-pro-preview",
         "label": "Google Gemini 3 Pro Preview",
         "tier": "balanced",
+        "providers": ["google-vertex", "google-ai-studio"],
+        "cache_control": True,
     },
     {
         "id": "google/gemini-2.5-flash-preview-09-2025",
         "label": "Google Gemini 2.5 Flash Preview (09/2025)",
         "tier": "fast",
+        "providers": ["google-vertex", "google-ai-studio"],
+        "cache_control": True,
     },
     {
         "id": "x-ai/grok-4.1-fast",
         "label": "xAI Grok 4.1 Fast",
         "tier": "fast",
+        "providers": ["xai"],
+        "cache_control": False,
     },
     {
         "id": "qwen/qwen-turbo",
         "label": "Qwen Turbo",
         "tier": "fast",
+        "providers": ["alibaba"],
+        "cache_control": False,
     },
     {
         "id": "meta-llama/llama-4-maverick",
         "label": "Meta Llama 4 Maverick",
         "tier": "balanced",
+        "providers": [],
+        "cache_control": False,
     },
     {
         "id": "qwen/qwen3-vl-8b-thinking",
         "label": "Qwen3 VL 8B Thinking",
         "tier": "vision",
+        "providers": [],
+        "cache_control": False,
     },
 ]
 
 
+MODEL_CATALOG = {model["id"]: model for model in OPENROUTER_MODELS}
+
+
 class OpenRouterSettings(BaseModel):
     api_base: str = "https://openrouter.ai/api/v1"
     default_model: str = "google/gemini-3-pro-preview"
+    # Shared by every client in the process for the same key + model.
+    requests_per_minute: int = Field(60, ge=1)
     available_models: List[str] = Field(
         default_factory=lambda: [model["id"] for model in OPENROUTER_MODELS]
     )
@@ -93,7 +119,9 @@ class RuleSet(BaseModel):
     svo_pattern_preference: str = "High"  # High, Medium, Low
 
     @classmethod
+    @lru_cache(maxsize=None)
     def get_for_profile(cls, profile: ContentProfile) -> "RuleSet":
+        # Cached per profile: callers share the instance and must not mutate it.
         rules = cls()
 
         if profile == ContentProfile.THOUGHT_LEADERSHIP:
@@ -117,6 +145,18 @@ class AppConfig(BaseModel):
     mode: OptimizationMode = OptimizationMode.STRICT
     openrouter: OpenRouterSettings = Field(default_factory=OpenRouterSettings)
     selected_model: str = "google/gemini-3-pro-preview"
+    # Batched rewrites lose accuracy as they grow, so keep each request small.
+    max_paras_per_batch: int = Field(3, ge=1)
+    # Upper bound on in-flight OpenRouter requests across concurrent stages.
+    max_concurrent_llm_calls: int = Field(8, ge=1)
+    # Reuse responses for repeated prompts (see utils/response_cache.py).
+    cache_enabled: bool = True
+    cache_max_entries: int = Field(2048, ge=1)
+    # Near-duplicate matching can hand one paragraph the rewrite of another
+    # (a changed number, name, or negation), so it is opt-in and needs
+    # sentence-transformers.
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = Field(0.92, ge=0, le=1)
 
     @property
     def rules(self) -> RuleSet:
@@ -126,6 +166,9 @@ class AppConfig(BaseModel):
     def model_options(self):
         return OPENROUTER_MODELS
 
+    def model_entry(self, model_id: str) -> Dict[str, Any]:
+        return MODEL_CATALOG.get(model_id, {})
+
     def validate_model(self, model_id: str) -> str:
         if model_id not in self.openrouter.available_models:
             raise ValueError(
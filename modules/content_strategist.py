@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 from modules.agent_base import (
@@ -10,27 +11,42 @@ from modules.agent_base import (
     AgentPassResult,
     ContentBlock,
     ContentBlockType,
-    OptimizationAgent,
+    LLMRewriteAgent,
     OptimizationFeedback,
     Severity,
 )
-from modules.config import AppConfig, RuleSet
-from utils.llm_handler import ChatMessage, OpenRouterClient
+from modules.config import RuleSet
+from modules.style_guide import agent_messages
+from utils.llm_handler import ChatMessage
+from utils.text_scan import word_count
 
+_PREVIEW_RE = re.compile(r"(?:we'll|this guide|you'll)", re.IGNORECASE)
+_QUESTION_PREFIX_RE = re.compile(
+    r"^(?:how|what|why|when|where|who|should)",
+    re.IGNORECASE,
+)
+
+
+@dataclass(slots=True)
+class _StructureScan:
+    """What the strategist needs from one walk over the document.
+
+    H1s and FAQs are only counted (and the first H1 kept), since no rule
+    needs the full lists.
+    """
+
+    h2_blocks: List[ContentBlock] = field(default_factory=list)
+    first_h1: Optional[ContentBlock] = None
+    h1_count: int = 0
+    faq_count: int = 0
+    first_paragraph: Optional[ContentBlock] = None
 
-class ContentStrategistAgent(OptimizationAgent):
+
+class ContentStrategistAgent(LLMRewriteAgent):
     """Guarantees structural readiness before other agents run."""
 
     stage_name = "Stage 1 · Content Strategist"
 
-    def __init__(
-        self,
-        config: AppConfig,
-        llm_client: Optional[OpenRouterClient] = None,
-    ) -> None:
-        super().__init__(config)
-        self.llm = llm_client
-
     # ------------------------------------------------------------------
     # Structural layer
     # ------------------------------------------------------------------
@@ -39,11 +55,9 @@ class ContentStrategistAgent(OptimizationAgent):
         optimized_blocks: List[ContentBlock] = []
         rules: RuleSet = self.config.rules
 
-        blocks = context.document.blocks
-        h1_blocks = [b for b in blocks if b.type == ContentBlockType.H1]
-        h2_blocks = [b for b in blocks if b.type == ContentBlockType.H2]
+        scan = self._scan(context)
 
-        if len(h1_blocks) != 1:
+        if scan.h1_count != 1:
             feedback.append(
                 self._issue(
                     element="H1",
@@ -52,13 +66,13 @@ class ContentStrategistAgent(OptimizationAgent):
                         "Create a single H1 that states the primary question "
                         "this page answers for AI Overviews."
                     ),
-                    optimized=self._suggest_core_question(h1_blocks[:1]),
+                    optimized=self._suggest_core_question(scan.first_h1),
                     severity=Severity.HIGH,
                 )
             )
 
         if rules.require_answer_first_intro:
-            intro = self._first_paragraph(blocks)
+            intro = self._first_paragraph(context)
             if intro and not self._is_answer_first_intro(intro.text):
                 optimized_blocks.append(
                     ContentBlock(
@@ -85,7 +99,7 @@ class ContentStrategistAgent(OptimizationAgent):
                 )
 
         if rules.require_h2_questions:
-            for block in h2_blocks:
+            for block in scan.h2_blocks:
                 if not block.text.strip().endswith("?"):
                     optimized = self._questionize(block.text)
                     optimized_blocks.append(
@@ -114,8 +128,7 @@ class ContentStrategistAgent(OptimizationAgent):
                     )
 
         if rules.require_faq:
-            faq_blocks = [b for b in blocks if b.type == ContentBlockType.FAQ]
-            if len(faq_blocks) < 3:
+            if scan.faq_count < 3:
                 feedback.append(
                     self._issue(
                         element="FAQ section",
@@ -150,18 +163,48 @@ class ContentStrategistAgent(OptimizationAgent):
         context: AgentContext,
         structural_result: AgentPassResult,
     ) -> AgentPassResult:
-        feedback: List[OptimizationFeedback] = []
-        optimized_blocks: List[ContentBlock] = []
+        intro_block = self._intro_to_rewrite(context, structural_result)
+        if intro_block is None:
+            return self._copy_result(None, "")
+        return self._copy_result(
+            intro_block,
+            self._rewrite_blocks([intro_block])[0],
+        )
 
-        intro_block = self._first_paragraph(context.document.blocks)
-        intro_id = getattr(intro_block, "block_id", None)
-        already_adjusted = any(
-            block.block_id == intro_id
-            for block in structural_result.optimized_blocks
+    async def copy_pass_async(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> AgentPassResult:
+        intro_block = self._intro_to_rewrite(context, structural_result)
+        if intro_block is None:
+            return self._copy_result(None, "")
+        return self._copy_result(
+            intro_block,
+            (await self._rewrite_blocks_async([intro_block]))[0],
         )
 
-        if not already_adjusted and intro_block and self.llm:
-            optimized_text = self._llm_answer_first_intro(intro_block.text)
+    def _intro_to_rewrite(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> Optional[ContentBlock]:
+        intro_block = self._first_paragraph(context)
+        intro_id = getattr(intro_block, "block_id", None)
+        already_adjusted = intro_id in structural_result.optimized_block_ids
+        if already_adjusted or not self.llm:
+            return None
+        return intro_block
+
+    def _copy_result(
+        self,
+        intro_block: Optional[ContentBlock],
+        optimized_text: str,
+    ) -> AgentPassResult:
+        feedback: List[OptimizationFeedback] = []
+        optimized_blocks: List[ContentBlock] = []
+
+        if intro_block is not None:
             optimized_blocks.append(
                 ContentBlock(
                     block_id=intro_block.block_id,
@@ -185,6 +228,9 @@ class ContentStrategistAgent(OptimizationAgent):
                     severity=Severity.MEDIUM,
                 )
             )
+            truncated = self._truncation_issue(intro_block, "Introduction")
+            if truncated is not None:
+                feedback.append(truncated)
 
         score_delta = 10 if not feedback else 0
         return AgentPassResult(
@@ -196,26 +242,42 @@ class ContentStrategistAgent(OptimizationAgent):
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
-    def _first_paragraph(
-        self,
-        blocks: List[ContentBlock],
-    ) -> Optional[ContentBlock]:
+    def _scan(self, context: AgentContext) -> _StructureScan:
+        return self._memo(
+            context,
+            "structure",
+            lambda: self._walk(context.document.blocks),
+        )
+
+    def _walk(self, blocks: List[ContentBlock]) -> _StructureScan:
+        scan = _StructureScan()
         for block in blocks:
-            if block.type == ContentBlockType.PARAGRAPH:
-                return block
-        return None
+            if block.type == ContentBlockType.H2:
+                scan.h2_blocks.append(block)
+            elif block.type == ContentBlockType.H1:
+                if scan.first_h1 is None:
+                    scan.first_h1 = block
+                scan.h1_count += 1
+            elif block.type == ContentBlockType.FAQ:
+                scan.faq_count += 1
+            elif (
+                block.type == ContentBlockType.PARAGRAPH
+                and scan.first_paragraph is None
+            ):
+                scan.first_paragraph = block
+        return scan
+
+    def _first_paragraph(self, context: AgentContext) -> Optional[ContentBlock]:
+        return self._scan(context).first_paragraph
 
     def _is_answer_first_intro(self, text: str) -> bool:
-        word_count = len(text.split())
-        has_preview = bool(
-            re.search(r"(we'll|this guide|you'll)", text, flags=re.IGNORECASE)
-        )
-        return 30 <= word_count <= 60 and has_preview
+        words = word_count(text)
+        has_preview = bool(_PREVIEW_RE.search(text))
+        return 30 <= words <= 60 and has_preview
 
     def _questionize(self, text: str) -> str:
         cleaned = text.strip().rstrip("?")
-        pattern = r"^(how|what|why|when|where|who|should)"
-        if not re.match(pattern, cleaned, flags=re.IGNORECASE):
+        if not _QUESTION_PREFIX_RE.match(cleaned):
             cleaned = f"How does {cleaned}".strip()
         return f"{cleaned}?"
 
@@ -230,8 +292,8 @@ class ContentStrategistAgent(OptimizationAgent):
             "covers."
         )
 
-    def _suggest_core_question(self, h1_blocks: List[ContentBlock]) -> str:
-        base = h1_blocks[0].text if h1_blocks else "the main topic"
+    def _suggest_core_question(self, first_h1: Optional[ContentBlock]) -> str:
+        base = first_h1.text if first_h1 else "the main topic"
         base = base.rstrip("?")
         return f"What is {base}?"
 
@@ -253,24 +315,10 @@ class ContentStrategistAgent(OptimizationAgent):
             impact_score=impact,
         )
 
-    def _llm_answer_first_intro(self, text: str) -> str:
-        if not self.llm:
-            return text
+    def _messages(self, text: str) -> List[ChatMessage]:
         prompt = (
             "Rewrite the introduction into a 35-45 word answer-first paragraph. "
             "State the direct answer in sentence one, then preview the H2 "
             "questions."
         )
-        response = self.llm.chat(
-            messages=[
-                ChatMessage(
-                    role="system",
-                    content="You are an SEO content strategist.",
-                ),
-                ChatMessage(
-                    role="user",
-                    content=f"{prompt}\n\n{text}",
-                ),
-            ]
-        )
-        return response.content.strip()
+        return agent_messages("You are an SEO content strategist.", prompt, text)
@@ -153,9 +153,15 @@ class MetadataOptimizerAgent(OptimizationAgent):
         schema: Dict[str, object],
         blocks: List[ContentBlock],
     ) -> bool:
-        faq_blocks = [b for b in blocks if b.metadata.get("h2_label") == "FAQ"]
         faq_schema = schema.get("faq", []) if isinstance(schema, dict) else []
-        return bool(faq_blocks and faq_schema)
+        if not faq_schema:
+            return False
+        # Only existence matters, so stop at the first FAQ-labelled block.
+        first_faq = next(
+            (b for b in blocks if b.metadata.get("h2_label") == "FAQ"),
+            None,
+        )
+        return first_faq is not None
 
     def _synthesize_title(self, context: AgentContext) -> str:
         keyword = context.document.metadata.get(
@@ -3,56 +3,61 @@
 from __future__ import annotations
 
 import re
-from typing import List, Optional
+from typing import List
+
+import numpy as np
 
 from modules.agent_base import (
     AgentContext,
     AgentPassResult,
     ContentBlock,
     ContentBlockType,
-    OptimizationAgent,
+    LLMRewriteAgent,
     OptimizationFeedback,
     Severity,
 )
-from modules.config import AppConfig
-from utils.llm_handler import ChatMessage, OpenRouterClient
+from modules.style_guide import agent_messages
+from utils.llm_handler import ChatMessage
+from utils.text_scan import passive_mask, split_sentences, word_count
 
 MAX_SENTENCE_LEN = 30
 
+_ENTITY_RE = re.compile(r"[A-Z][a-z]+")
+
 
-class NLPStylistAgent(OptimizationAgent):
+class NLPStylistAgent(LLMRewriteAgent):
     """Refactors sentences so they are extraction-friendly for NLP models."""
 
     stage_name = "Stage 3 · NLP Stylist"
 
-    def __init__(
-        self,
-        config: AppConfig,
-        llm_client: Optional[OpenRouterClient] = None,
-    ) -> None:
-        super().__init__(config)
-        self.llm = llm_client
-
     def structural_pass(self, context: AgentContext) -> AgentPassResult:
         feedback: List[OptimizationFeedback] = []
         optimized_blocks: List[ContentBlock] = []
 
-        for block in context.document.blocks:
-            if block.type != ContentBlockType.PARAGRAPH:
-                continue
-            sentences = self._sentences(block.text)
-            long_sentences = [
-                sentence
-                for sentence in sentences
-                if len(sentence.split()) > MAX_SENTENCE_LEN
-            ]
-            passive_sentences = [
-                sentence
-                for sentence in sentences
-                if self._looks_passive(sentence)
-            ]
-
-            if long_sentences:
+        # Classify every sentence of the document at once, then slice the
+        # masks per paragraph; only flagged indices are touched in Python.
+        paragraphs = [
+            block
+            for block in context.document.blocks
+            if block.type == ContentBlockType.PARAGRAPH
+        ]
+        per_block = [self._sentences(context, block.text) for block in paragraphs]
+        sentences = [sentence for group in per_block for sentence in group]
+        bounds = np.zeros(len(per_block) + 1, dtype=np.intp)
+        np.cumsum([len(group) for group in per_block], out=bounds[1:])
+        word_counts = np.fromiter(
+            (word_count(sentence) for sentence in sentences),
+            dtype=np.int32,
+            count=len(sentences),
+        )
+        long_mask = word_counts > MAX_SENTENCE_LEN
+        passive = passive_mask(sentences)
+
+        for block, start, end in zip(paragraphs, bounds[:-1], bounds[1:]):
+            long_hits = np.flatnonzero(long_mask[start:end])
+            passive_hits = np.flatnonzero(passive[start:end])
+
+            if long_hits.size:
                 feedback.append(
                     self._issue(
                         element=f"Paragraph {block.block_id}",
@@ -61,11 +66,11 @@ class NLPStylistAgent(OptimizationAgent):
                             "Split sentences so each carries one "
                             "subject-verb-object idea."
                         ),
-                        optimized=long_sentences[0],
+                        optimized=sentences[start + long_hits[0]],
                         severity=Severity.MEDIUM,
                     )
                 )
-            if passive_sentences:
+            if passive_hits.size:
                 feedback.append(
                     self._issue(
                         element=f"Paragraph {block.block_id}",
@@ -77,7 +82,7 @@ class NLPStylistAgent(OptimizationAgent):
                             "Rewrite sentences so the subject performs "
                             "the action directly."
                         ),
-                        optimized=passive_sentences[0],
+                        optimized=sentences[start + passive_hits[0]],
                         severity=Severity.MEDIUM,
                     )
                 )
@@ -94,48 +99,69 @@ class NLPStylistAgent(OptimizationAgent):
         context: AgentContext,
         structural_result: AgentPassResult,
     ) -> AgentPassResult:
-        feedback: List[OptimizationFeedback] = []
-        optimized_blocks: List[ContentBlock] = []
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(candidates, self._rewrite_blocks(candidates))
+
+    async def copy_pass_async(
+        self,
+        context: AgentContext,
+        structural_result: AgentPassResult,
+    ) -> AgentPassResult:
+        candidates = self._rewrite_candidates(context)
+        return self._copy_result(
+            candidates,
+            await self._rewrite_blocks_async(candidates),
+        )
 
+    def _rewrite_candidates(self, context: AgentContext) -> List[ContentBlock]:
         # Limit processing to avoid timeouts
-        processed_count = 0
         MAX_BLOCKS_TO_PROCESS = 5
+        candidates = [
+            block
+            for block in context.document.blocks
+            if block.type == ContentBlockType.PARAGRAPH
+            and self._needs_density_upgrade(context, block.text)
+        ]
+        return self._limit_distinct(candidates, MAX_BLOCKS_TO_PROCESS)
 
-        for block in context.document.blocks:
-            if block.type != ContentBlockType.PARAGRAPH:
-                continue
-            
-            if self._needs_density_upgrade(block.text):
-                if processed_count < MAX_BLOCKS_TO_PROCESS:
-                    rewritten = self._rewrite_dense(block.text)
-                    processed_count += 1
-
-                    optimized_blocks.append(
-                        ContentBlock(
-                            block_id=block.block_id,
-                            type=block.type,
-                            text=rewritten,
-                            metadata=block.metadata,
-                        )
-                    )
-                    feedback.append(
-                        self._issue(
-                            element=f"Paragraph {block.block_id}",
-                            issue=(
-                                "Sentences lack entity-rich, active "
-                                "constructions."
-                            ),
-                            mandate=(
-                                "Rewrite using SVO, explicit entities, and "
-                                "cause→effect connectors."
-                            ),
-                            optimized=rewritten,
-                            severity=Severity.HIGH,
-                        )
-                    )
-                else:
-                    # Skip optimization if limit reached
-                    pass
+    def _copy_result(
+        self,
+        candidates: List[ContentBlock],
+        rewrites: List[str],
+    ) -> AgentPassResult:
+        feedback: List[OptimizationFeedback] = []
+        optimized_blocks: List[ContentBlock] = []
+
+        for block, rewritten in zip(candidates, rewrites):
+            optimized_blocks.append(
+                ContentBlock(
+                    block_id=block.block_id,
+                    type=block.type,
+                    text=rewritten,
+                    metadata=block.metadata,
+                )
+            )
+            feedback.append(
+                self._issue(
+                    element=f"Paragraph {block.block_id}",
+                    issue=(
+                        "Sentences lack entity-rich, active "
+                        "constructions."
+                    ),
+                    mandate=(
+                        "Rewrite using SVO, explicit entities, and "
+                        "cause→effect connectors."
+                    ),
+                    optimized=rewritten,
+                    severity=Severity.HIGH,
+                )
+            )
+            truncated = self._truncation_issue(
+                block,
+                f"Paragraph {block.block_id}",
+            )
+            if truncated is not None:
+                feedback.append(truncated)
 
         score_delta = max(0, 80 - 10 * len(feedback))
         return AgentPassResult(
@@ -144,49 +170,32 @@ class NLPStylistAgent(OptimizationAgent):
             score_delta=score_delta,
         )
 
-    def _sentences(self, text: str) -> List[str]:
-        return [
-            sentence.strip()
-            for sentence in re.split(r"(?<=[.!?])\s+", text)
-            if sentence.strip()
-        ]
-
-    def _looks_passive(self, sentence: str) -> bool:
-        return bool(
-            re.search(
-                r"\b(be|been|being|is|was|were)\b\s+\w+ed\b",
-                sentence.lower(),
-            )
-        )
+    def _sentences(self, context: AgentContext, text: str) -> List[str]:
+        # Keyed by text: repeated paragraphs share an entry, and rewritten
+        # text never hits a stale split.
+        cache = context.notes.setdefault("sentences", {})
+        if text not in cache:
+            cache[text] = split_sentences(text)
+        return cache[text]
 
-    def _needs_density_upgrade(self, text: str) -> bool:
-        sentences = self._sentences(text)
+    def _needs_density_upgrade(self, context: AgentContext, text: str) -> bool:
+        sentences = self._sentences(context, text)
         if not sentences:
             return False
-        entity_mentions = re.findall(r"[A-Z][a-z]+", text)
+        entity_mentions = _ENTITY_RE.findall(text)
         return len(sentences) < 3 or len(entity_mentions) < 2
 
-    def _rewrite_dense(self, text: str) -> str:
-        if not self.llm:
-            return text
+    def _messages(self, text: str) -> List[ChatMessage]:
         prompt = (
             "Rephrase this paragraph using short SVO sentences and causal "
             "connectors. Add quantified comparisons and cite explicit "
             "entities."
         )
-        response = self.llm.chat(
-            messages=[
-                ChatMessage(
-                    role="system",
-                    content="You polish text for NLP extraction.",
-                ),
-                ChatMessage(
-                    role="user",
-                    content=f"{prompt}\n\n{text}",
-                ),
-            ]
+        return agent_messages(
+            "You polish text for NLP extraction.",
+            prompt,
+            text,
         )
-        return response.content.strip()
 
     def _issue(
         self,
@@ -0,0 +1,63 @@
+"""An empty completion keeps the original text instead of deleting it."""
+
+import asyncio
+
+from modules.agent_base import (
+    AgentContext,
+    AgentPassResult,
+    ContentBlock,
+    ContentBlockType,
+    DocumentPayload,
+)
+from modules.config import AppConfig
+from modules.nlp_stylist import NLPStylistAgent
+from utils.llm_handler import LLMResponse, parse_batch_rewrites
+
+TEXT = "Short para."
+
+
+class EmptyLLM:
+    def chat(self, messages, **kwargs):
+        return LLMResponse(model="fake", content="  ")
+
+    async def chat_async(self, messages, **kwargs):
+        return self.chat(messages, **kwargs)
+
+
+def _context(texts) -> AgentContext:
+    config = AppConfig()
+    document = DocumentPayload(
+        raw_text="\n\n".join(texts),
+        blocks=[
+            ContentBlock(
+                block_id=str(index),
+                type=ContentBlockType.PARAGRAPH,
+                text=text,
+            )
+            for index, text in enumerate(texts)
+        ],
+        profile=config.profile,
+    )
+    return AgentContext(document=document, config=config)
+
+
+def test_blank_batch_rewrite_is_unusable():
+    assert parse_batch_rewrites('{"0": "Fine.", "1": " "}', 2) is None
+    assert parse_batch_rewrites('{"0": "Fine.", "1": "Also."}', 2) == [
+        "Fine.",
+        "Also.",
+    ]
+
+
+def test_empty_completion_keeps_paragraph():
+    texts = [TEXT, "Other para."]
+    agent = NLPStylistAgent(AppConfig(), EmptyLLM())
+    for context in (_context(texts[:1]), _context(texts)):
+        sync = agent.copy_pass(context, AgentPassResult())
+        streamed = asyncio.run(
+            agent.copy_pass_async(context, AgentPassResult())
+        )
+        for result in (sync, streamed):
+            assert [block.text for block in result.optimized_blocks] == [
+                block.text for block in context.document.blocks
+            ]
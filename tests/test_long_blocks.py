@@ -0,0 +1,120 @@
+"""Over-long blocks are rewritten by their head, keep their tail, and say so."""
+
+import asyncio
+
+import pytest
+
+from modules.agent_base import (
+    AgentContext,
+    AgentPassResult,
+    ContentBlock,
+    ContentBlockType,
+    DocumentPayload,
+    Severity,
+)
+from modules.authority_builder import AuthorityBuilderAgent
+from modules.chunk_optimizer import ChunkOptimizerAgent
+from modules.config import AppConfig
+from modules.content_strategist import ContentStrategistAgent
+from modules.nlp_stylist import NLPStylistAgent
+from utils.llm_handler import LLMResponse
+from utils.text_scan import MAX_LLM_CHARS, split_for_llm
+
+REWRITE = "Rewritten head."
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def chat(self, messages, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return LLMResponse(model="fake", content=REWRITE)
+
+    async def chat_async(self, messages, **kwargs):
+        return self.chat(messages, **kwargs)
+
+
+def _long_paragraph() -> str:
+    sentences = []
+    index = 0
+    while sum(len(s) + 1 for s in sentences) < 10_000:
+        sentences.append(f"the cache keeps every word of sentence {index}.")
+        index += 1
+    return " ".join(sentences)
+
+
+def _context(text: str) -> AgentContext:
+    config = AppConfig()
+    document = DocumentPayload(
+        raw_text=text,
+        blocks=[
+            ContentBlock(
+                block_id="1",
+                type=ContentBlockType.PARAGRAPH,
+                text=text,
+            )
+        ],
+        profile=config.profile,
+    )
+    return AgentContext(document=document, config=config)
+
+
+def test_split_for_llm_round_trips():
+    text = _long_paragraph()
+    head, tail = split_for_llm(text)
+    assert head + tail == text
+    assert 0 < len(head) <= MAX_LLM_CHARS
+    assert head.endswith(".")
+
+
+def test_stylist_keeps_tail_of_long_paragraph():
+    text = _long_paragraph()
+    llm = FakeLLM()
+    agent = NLPStylistAgent(AppConfig(), llm)
+    result = asyncio.run(
+        agent.copy_pass_async(_context(text), AgentPassResult())
+    )
+
+    _, tail = split_for_llm(text)
+    (block,) = result.optimized_blocks
+    assert block.text == f"{REWRITE} {tail.lstrip()}"
+    assert all(len(prompt) <= MAX_LLM_CHARS for prompt in llm.prompts)
+
+
+def test_strategist_keeps_tail_of_long_intro():
+    text = _long_paragraph()
+    agent = ContentStrategistAgent(AppConfig(), FakeLLM())
+    result = asyncio.run(
+        agent.copy_pass_async(_context(text), AgentPassResult())
+    )
+
+    _, tail = split_for_llm(text)
+    (block,) = result.optimized_blocks
+    assert block.text.startswith(REWRITE)
+    assert block.text.endswith(tail.lstrip())
+
+
+@pytest.mark.parametrize(
+    "agent_class",
+    [
+        ContentStrategistAgent,
+        ChunkOptimizerAgent,
+        NLPStylistAgent,
+        AuthorityBuilderAgent,
+    ],
+)
+def test_every_rewriting_agent_reports_truncation(agent_class):
+    # One run-on sentence, so every agent selects it for a rewrite.
+    text = " ".join(f"word{index}" for index in range(2_000))
+    agent = agent_class(AppConfig(), FakeLLM())
+    result = asyncio.run(
+        agent.copy_pass_async(_context(text), AgentPassResult())
+    )
+
+    (block,) = result.optimized_blocks
+    assert block.text.startswith(REWRITE)
+    (note,) = [
+        item for item in result.feedback if item.severity == Severity.LOW
+    ]
+    assert f"exceeds {MAX_LLM_CHARS} characters" in note.current_issue
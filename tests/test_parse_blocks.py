@@ -0,0 +1,54 @@
+"""parse_blocks must split exactly like the original splitlines() loop."""
+
+import random
+
+import app
+from modules.agent_base import ContentBlockType
+
+# Every separator str.splitlines() accepts, plus characters that exercise
+# heading markers and whitespace trimming.
+ALPHABET = [
+    "a", "b", "#", "#", " ", " ", "\t", "\xa0", "\u3000", "?",
+    "\n", "\r", "\r\n", "\v", "\f", "\x1c", "\x1d", "\x1e",
+    "\x85", "\u2028", "\u2029",
+]
+
+
+def reference_blocks(raw_text):
+    """The pre-regex implementation, kept as the specification."""
+    blocks = []
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        block_type = ContentBlockType.PARAGRAPH
+        if stripped.startswith("### "):
+            block_type = ContentBlockType.H3
+            stripped = stripped[4:]
+        elif stripped.startswith("## "):
+            block_type = ContentBlockType.H2
+            stripped = stripped[3:]
+        elif stripped.startswith("# "):
+            block_type = ContentBlockType.H1
+            stripped = stripped[2:]
+        blocks.append((block_type, stripped))
+    return blocks
+
+
+def parsed(raw_text):
+    return [(block.type, block.text) for block in app.parse_blocks(raw_text)]
+
+
+def test_cr_only_upload_splits_into_lines():
+    assert parsed("# T\rPara\rMore") == [
+        (ContentBlockType.H1, "T"),
+        (ContentBlockType.PARAGRAPH, "Para"),
+        (ContentBlockType.PARAGRAPH, "More"),
+    ]
+
+
+def test_matches_splitlines_on_random_text():
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+        assert parsed(text) == reference_blocks(text), repr(text)
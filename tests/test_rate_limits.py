@@ -0,0 +1,77 @@
+"""Requests are paced by the shared bucket and retried on 429 and 5xx."""
+
+import asyncio
+import itertools
+import time
+
+import httpx
+import msgspec
+import pytest
+
+from modules.config import AppConfig
+from utils import llm_handler
+from utils.llm_handler import ChatMessage, OpenRouterClient
+from utils.rate_limiter import TokenBucket
+
+COMPLETION = msgspec.json.encode(
+    {"choices": [{"message": {"role": "assistant", "content": "done"}}]}
+)
+_keys = itertools.count()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_handler, "_BACKOFF_SECONDS", 0.0)
+    # A fresh key per test, so no test inherits another's bucket.
+    client = OpenRouterClient(
+        AppConfig(cache_enabled=False),
+        api_key=f"test-key-{next(_keys)}",
+    )
+    yield client
+    client.close()
+
+
+def serve(client, statuses, headers=None):
+    """Answer each request with the next status; return the request times."""
+    replies = iter(statuses)
+    seen = []
+
+    def handler(request):
+        seen.append(time.monotonic())
+        status = next(replies)
+        if status != 200:
+            return httpx.Response(status, headers=headers)
+        return httpx.Response(200, content=COMPLETION)
+
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client._in_flight = asyncio.Semaphore(4)
+    return seen
+
+
+def ask(client):
+    return client.chat([ChatMessage(role="user", content="hello")])
+
+
+def test_429_waits_out_retry_after_then_succeeds(client):
+    seen = serve(client, [429, 200], headers={"Retry-After": "0.2"})
+
+    assert ask(client).content == "done"
+    assert len(seen) == 2
+    assert seen[1] - seen[0] >= 0.2
+
+
+def test_5xx_raises_after_the_last_attempt(client):
+    seen = serve(client, [503] * llm_handler._ATTEMPTS)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        ask(client)
+    assert len(seen) == llm_handler._ATTEMPTS
+
+
+def test_bucket_queues_callers_behind_the_deficit():
+    bucket = TokenBucket(60)
+    waits = [bucket._reserve() for _ in range(62)]
+
+    assert max(waits[:60]) < 0.1
+    assert waits[60] == pytest.approx(1.0, abs=0.1)
+    assert waits[61] == pytest.approx(2.0, abs=0.1)
@@ -0,0 +1,96 @@
+"""Every sentence and passive-voice backend must agree with the ``re`` rules."""
+
+import random
+import re
+
+import numpy as np
+import pytest
+
+from utils import text_scan
+from utils.text_scan import PASSIVE_RE, SENTENCE_SPLIT_RE
+
+# Terminators, every character ``re`` treats as ``\s`` in a str pattern
+# (ASCII and multi-byte), and look-alikes that must not count as either.
+SENTENCE_ALPHABET = [
+    "a", "B", "\xe9", "\u65e5", ".", ".", "!", "?", ",", " ", " ", "\t",
+    "\n", "\r", "\v", "\f", "\x1c", "\x1f", "\x85", "\xa0", "\u1680",
+    "\u2000", "\u200a", "\u200b", "\u2028", "\u2029", "\u202f",
+    "\u205f", "\u3000", "\ufeff",
+]
+PASSIVE_ALPHABET = [
+    "was", "Was", "IS", "be", "been", "being", "were", "wasn", "called",
+    "ed", "red", "Ed", "caf\xe9", "r\xe9dig\xe9ed", "_ed", " ", " ", "\t",
+    "\n", "\xa0", "\x1c", "\u3000", ".", "-", "x",
+]
+
+BACKENDS = ["re"]
+if text_scan.hyperscan is not None:
+    BACKENDS.append("hyperscan")
+if text_scan.numba is not None:
+    BACKENDS.append("numba")
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    if request.param != "numba":
+        monkeypatch.setattr(text_scan, "numba", None)
+    if request.param == "re":
+        monkeypatch.setattr(text_scan, "hyperscan", None)
+    return request.param
+
+
+def reference_sentences(text):
+    return [
+        piece.strip()
+        for piece in SENTENCE_SPLIT_RE.split(text)
+        if piece.strip()
+    ]
+
+
+def reference_offsets(text):
+    """UTF-8 offsets just past each terminator that ``\\s`` follows."""
+    return [
+        len(text[:match.end()].encode("utf-8"))
+        for match in re.finditer(r"[.!?](?=\s)", text)
+    ]
+
+
+def random_text(rng, alphabet, size):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, size)))
+
+
+def test_split_sentences_matches_re(backend):
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = random_text(rng, SENTENCE_ALPHABET, 40)
+        assert text_scan.split_sentences(text) == reference_sentences(text), (
+            repr(text)
+        )
+
+
+def test_passive_mask_matches_re(backend):
+    rng = random.Random(1)
+    for _ in range(1000):
+        sentences = [
+            random_text(rng, PASSIVE_ALPHABET, 8)
+            for _ in range(rng.randint(0, 6))
+        ]
+        expected = [bool(PASSIVE_RE.search(s)) for s in sentences]
+        assert text_scan.passive_mask(sentences).tolist() == expected, (
+            repr(sentences)
+        )
+
+
+def test_uncompiled_boundary_kernel_matches_re():
+    # Under Numba the module attribute is the compiled dispatcher; check the
+    # Python source it was compiled from, which runs even without Numba.
+    kernel = getattr(
+        text_scan._boundary_offsets,
+        "py_func",
+        text_scan._boundary_offsets,
+    )
+    rng = random.Random(2)
+    for _ in range(5000):
+        text = random_text(rng, SENTENCE_ALPHABET, 40)
+        data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+        assert kernel(data).tolist() == reference_offsets(text), repr(text)
@@ -2,11 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
+import io
 import os
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import requests
-from pydantic import BaseModel, Field
+import httpx
+import msgspec
 
 try:  # Streamlit is optional for local unit tests
     import streamlit as st  # type: ignore
@@ -14,27 +29,135 @@ except ModuleNotFoundError:  # pragma: no cover
     st = None
 
 from modules.config import AppConfig
+from utils.rate_limiter import TokenBucket, get_bucket, retry_after_seconds
+from utils.response_cache import get_cache
 
 
-class ChatMessage(BaseModel):
+# Request/response types are msgspec Structs: slotted, no per-field
+# validation on construction, and encoded without an intermediate dict.
+class ChatMessage(msgspec.Struct, frozen=True):
     role: str
     content: str
+    # Ends a cacheable prefix on models that need explicit breakpoints.
+    cache_breakpoint: bool = False
 
 
-class LLMRequest(BaseModel):
+class LLMRequest(msgspec.Struct):
     model: str
     messages: List[ChatMessage]
     temperature: float = 0.2
     max_tokens: int = 2048
     top_p: float = 0.95
     stop: Optional[List[str]] = None
-    metadata: Dict[str, str] = Field(default_factory=dict)
+    response_format: Optional[Dict[str, str]] = None
+    provider: Optional[Dict[str, Any]] = None
+    stream: bool = False
+    metadata: Dict[str, str] = msgspec.field(default_factory=dict)
 
 
-class LLMResponse(BaseModel):
+class LLMResponse(msgspec.Struct):
     model: str
     content: str
-    usage: Dict[str, int] = Field(default_factory=dict)
+    usage: Dict[str, int] = msgspec.field(default_factory=dict)
+
+
+# -- Wire formats ---------------------------------------------------------------
+# Only the fields we read are declared; msgspec skips the rest while decoding.
+
+
+class _ContentPart(msgspec.Struct, omit_defaults=True):
+    type: str
+    text: str
+    cache_control: Optional[Dict[str, str]] = None
+
+
+class _WireMessage(msgspec.Struct):
+    role: str
+    content: Union[str, List[_ContentPart]]
+
+
+class _CompletionMessage(msgspec.Struct):
+    content: Optional[str] = None
+
+
+class _CompletionChoice(msgspec.Struct):
+    message: _CompletionMessage
+
+
+class _CompletionUsage(msgspec.Struct):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
+class _Completion(msgspec.Struct):
+    choices: List[_CompletionChoice]
+    usage: Optional[_CompletionUsage] = None
+
+
+class _StreamDelta(msgspec.Struct):
+    content: Optional[str] = None
+
+
+class _StreamChoice(msgspec.Struct):
+    delta: _StreamDelta
+
+
+class _StreamChunk(msgspec.Struct):
+    choices: List[_StreamChoice] = msgspec.field(default_factory=list)
+    usage: Optional[_CompletionUsage] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+_REQUEST_ENCODER = msgspec.json.Encoder()
+_COMPLETION_DECODER = msgspec.json.Decoder(_Completion)
+_STREAM_DECODER = msgspec.json.Decoder(_StreamChunk)
+_BATCH_DECODER = msgspec.json.Decoder(Dict[str, str])
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+# A completion that hit one of these never ran, so POST is safe to re-send.
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# One try plus three retries; 5xx retries back off 0.3s, 0.6s, 1.2s and a
+# 429 waits out Retry-After through the shared token bucket instead.
+_ATTEMPTS = 4
+_BACKOFF_SECONDS = 0.3
+
+# Passed as ``response_format`` so providers that support it return bare JSON.
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+
+def build_batch_prompt(texts: List[str]) -> str:
+    """Enumerate paragraphs for a single batched rewrite request."""
+    numbered = "\n\n".join(
+        f"[{index}]\n{text}" for index, text in enumerate(texts)
+    )
+    return (
+        "Apply the instructions to every paragraph below. Respond with only a "
+        "JSON object mapping each id shown (as a string) to its rewritten "
+        'paragraph, e.g. {"0": "...", "1": "..."}.\n\n'
+        f"{numbered}"
+    )
+
+
+def parse_batch_rewrites(content: str, count: int) -> Optional[List[str]]:
+    """Return rewrites in id order, or ``None`` if the reply is unusable."""
+    body = content.strip()
+    if body.startswith("```"):
+        body = body.strip("`").strip()
+        if body.lower().startswith("json"):
+            body = body[4:]
+    try:
+        rewrites = _BATCH_DECODER.decode(body)
+    except msgspec.DecodeError:
+        return None
+
+    ids = [str(index) for index in range(count)]
+    if set(rewrites) != set(ids):
+        return None
+    stripped = [rewrites[key].strip() for key in ids]
+    # A blank rewrite would replace its paragraph with nothing.
+    if not all(stripped):
+        return None
+    return stripped
 
 
 class OpenRouterClient:
@@ -44,6 +167,89 @@ class OpenRouterClient:
         self.config = config
         self.api_key = api_key or self._resolve_api_key()
         self.base_url = config.openrouter.api_base.rstrip("/")
+        # Validated model id -> catalog entry, filled on first use.
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self.invalidate()
+        # Every request, sync or async, runs on one event loop owned by the
+        # client (see _io_loop), so a single HTTP/2 pool outlives each
+        # pipeline run's asyncio.run() loop and is shared across sessions.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self.cache = (
+            get_cache(
+                threshold=config.semantic_cache_threshold,
+                semantic=config.semantic_cache_enabled,
+                max_entries=config.cache_max_entries,
+            )
+            if config.cache_enabled
+            else None
+        )
+
+    def invalidate(self) -> None:
+        """Recompute per-client state after ``self.config`` changes."""
+        self._models.clear()
+        # Invariant per client, so build once instead of on every request.
+        self._headers = self._build_headers()
+        self._default_model_id = self.config.selected_model
+        self._model_entry(self._default_model_id)
+
+    def __enter__(self) -> "OpenRouterClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection pool and stop the client's event loop."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_pool(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def _close_pool(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = self._in_flight = None
+
+    def _io_loop(self) -> asyncio.AbstractEventLoop:
+        # httpx clients and semaphores bind to the loop they first run on,
+        # and each pipeline run starts a fresh loop, so the pool lives on a
+        # loop of its own that runs in a daemon thread for the client's life.
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="openrouter-io",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
+
+    def _submit(self, coro: Awaitable[LLMResponse]) -> "Future[LLMResponse]":
+        return asyncio.run_coroutine_threadsafe(coro, self._io_loop())
+
+    def _pool(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        # Only ever called on the client's loop, so no lock is needed.
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=60,
+                limits=httpx.Limits(max_connections=16),
+            )
+            self._in_flight = asyncio.Semaphore(
+                self.config.max_concurrent_llm_calls
+            )
+        return self._http, self._in_flight
 
     def _resolve_api_key(self) -> str:
         key = os.getenv("OPENROUTER_API_KEY")
@@ -59,7 +265,7 @@ class OpenRouterClient:
             )
         return key
 
-    def _headers(self) -> Dict[str, str]:
+    def _build_headers(self) -> Dict[str, str]:
         metadata = getattr(self.config, "metadata", {}) or {}
         referer = metadata.get("referer", "")
         title = metadata.get("app_title", "AI Content Optimizer")
@@ -71,29 +277,217 @@ class OpenRouterClient:
         }
 
     def send(self, request: LLMRequest) -> LLMResponse:
-        model_id = self.config.validate_model(request.model)
-        payload = request.dict()
-        payload["model"] = model_id
-
-        response = requests.post(
-            url=f"{self.base_url}/chat/completions",
-            headers=self._headers(),
-            json=payload,
-            timeout=60,
+        model_id, body = self._payload(request)
+        cached = self._cached(request)
+        if cached is not None:
+            return cached
+        response = self._submit(self._complete(model_id, body)).result()
+        return self._store(request, response)
+
+    async def send_async(
+        self,
+        request: LLMRequest,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """Send ``request``; with ``on_token``, stream the reply over SSE.
+
+        ``on_token`` receives each content delta as it arrives, on the
+        caller's event loop. Streamed and buffered calls share cache
+        entries, so ``request.stream`` stays False and only the wire payload
+        asks for a stream.
+        """
+        model_id, body = self._payload(request)
+        if self.cache is not None:
+            # Semantic lookups embed the prompt, which is CPU-bound.
+            cached = await asyncio.to_thread(self._cached, request)
+            if cached is not None:
+                if on_token is not None:
+                    on_token(cached.content)
+                return cached
+
+        forward: Optional[Callable[[str], None]] = None
+        if on_token is not None:
+            _, body = self._payload(msgspec.structs.replace(request, stream=True))
+            caller = asyncio.get_running_loop()
+            # Tokens arrive on the client's loop; hand them to the caller's.
+            forward = functools.partial(caller.call_soon_threadsafe, on_token)
+
+        response = await asyncio.wrap_future(
+            self._submit(self._complete(model_id, body, forward))
         )
-        response.raise_for_status()
-        data = response.json()
+        return await asyncio.to_thread(self._store, request, response)
 
-        choice = data["choices"][0]
-        usage = data.get("usage", {})
+    async def _complete(
+        self,
+        model_id: str,
+        body: bytes,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        """POST ``body`` on the client's loop, retrying 429 and 5xx replies."""
+        bucket = self._bucket(model_id)
+        client, in_flight = self._pool()
+        attempt = 0
+        while True:
+            attempt += 1
+            await bucket.acquire_async()
+            async with in_flight, client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=self._headers,
+                content=body,
+            ) as response:
+                # A 429 pauses the bucket, so the next acquire waits it out.
+                self._note_rate_limit(bucket, response)
+                if (
+                    response.status_code not in _RETRY_STATUSES
+                    or attempt == _ATTEMPTS
+                ):
+                    response.raise_for_status()
+                    if on_token is None:
+                        return self._parse_response(
+                            model_id,
+                            await response.aread(),
+                        )
+                    return await self._read_stream(model_id, response, on_token)
+            if response.status_code != 429:
+                await asyncio.sleep(_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    async def _read_stream(
+        self,
+        model_id: str,
+        response: httpx.Response,
+        on_token: Callable[[str], None],
+    ) -> LLMResponse:
+        content = io.StringIO()
+        usage = _CompletionUsage()
+        # Closed explicitly: breaking out on [DONE] would otherwise leave the
+        # line iterator to be finalized after the loop has gone.
+        async with contextlib.aclosing(response.aiter_lines()) as lines:
+            async for line in lines:
+                # Blank separators and ": keep-alive" comments carry no data.
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                chunk = _STREAM_DECODER.decode(data)
+                if chunk.error:
+                    message = chunk.error.get("message", chunk.error)
+                    raise RuntimeError(f"OpenRouter stream error: {message}")
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                for choice in chunk.choices:
+                    if choice.delta.content:
+                        content.write(choice.delta.content)
+                        on_token(choice.delta.content)
+
+        return LLMResponse(
+            model=model_id,
+            content=content.getvalue(),
+            usage={
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+            },
+        )
+
+    def _bucket(self, model_id: str) -> TokenBucket:
+        return get_bucket(
+            self.api_key,
+            model_id,
+            self.config.openrouter.requests_per_minute,
+        )
+
+    def _note_rate_limit(self, bucket: TokenBucket, response: Any) -> None:
+        """Pause ``bucket`` for Retry-After when the response is a 429.
+
+        Pausing the shared bucket holds back every other request for this
+        key and model too, not just the one being retried.
+        """
+        if response.status_code == 429:
+            bucket.pause(
+                retry_after_seconds(response.headers.get("Retry-After"))
+            )
+
+    def save_cache(self) -> None:
+        if self.cache is not None:
+            self.cache.save()
+
+    def _cached(self, request: LLMRequest) -> Optional[LLMResponse]:
+        if self.cache is None:
+            return None
+        entry = self.cache.get(request)
+        if entry is None:
+            return None
+        return LLMResponse(
+            model=entry.model,
+            content=entry.content,
+            usage=entry.usage,
+        )
+
+    def _store(self, request: LLMRequest, response: LLMResponse) -> LLMResponse:
+        # A blank reply is a failed call; caching it would replay it forever.
+        if self.cache is not None and response.content.strip():
+            self.cache.put(request, response)
+        return response
+
+    def _payload(self, request: LLMRequest) -> Tuple[str, bytes]:
+        model_id = request.model
+        entry = self._model_entry(model_id)
+        use_breakpoints = entry.get("cache_control", False)
+        provider = request.provider
+        if provider is None and entry.get("providers"):
+            # Sticky routing keeps repeat prefixes on a warm provider cache.
+            provider = {"order": entry["providers"], "allow_fallbacks": True}
+
+        wire = msgspec.structs.replace(
+            request,
+            messages=[
+                self._wire_message(message, use_breakpoints)
+                for message in request.messages
+            ],
+            provider=provider,
+        )
+        return model_id, _REQUEST_ENCODER.encode(wire)
+
+    def _model_entry(self, model_id: str) -> Dict[str, Any]:
+        entry = self._models.get(model_id)
+        if entry is None:
+            entry = self._models[model_id] = self.config.model_entry(
+                self.config.validate_model(model_id)
+            )
+        return entry
+
+    def _wire_message(
+        self,
+        message: ChatMessage,
+        use_breakpoints: bool,
+    ) -> _WireMessage:
+        if not (message.cache_breakpoint and use_breakpoints):
+            return _WireMessage(role=message.role, content=message.content)
+        return _WireMessage(
+            role=message.role,
+            content=[
+                _ContentPart(
+                    type="text",
+                    text=message.content,
+                    cache_control=_EPHEMERAL_CACHE,
+                )
+            ],
+        )
+
+    def _parse_response(self, model_id: str, body: bytes) -> LLMResponse:
+        completion = _COMPLETION_DECODER.decode(body)
+        choice = completion.choices[0]
+        usage = completion.usage or _CompletionUsage()
 
         return LLMResponse(
             model=model_id,
-            content=choice["message"]["content"],
+            content=choice.message.content or "",
             usage={
-                "prompt_tokens": usage.get("prompt_tokens", 0),
-                "completion_tokens": usage.get("completion_tokens", 0),
-                "total_tokens": usage.get("total_tokens", 0),
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
             },
         )
 
@@ -105,13 +499,37 @@ class OpenRouterClient:
         max_tokens: int = 2048,
         top_p: float = 0.95,
         stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
     ) -> LLMResponse:
         req = LLMRequest(
-            model=model or self.config.selected_model,
+            model=model or self._default_model_id,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
             top_p=top_p,
             stop=stop,
+            response_format=response_format,
         )
         return self.send(req)
+
+    async def chat_async(
+        self,
+        messages: List[ChatMessage],
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        max_tokens: int = 2048,
+        top_p: float = 0.95,
+        stop: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> LLMResponse:
+        req = LLMRequest(
+            model=model or self._default_model_id,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            stop=stop,
+            response_format=response_format,
+        )
+        return await self.send_async(req, on_token=on_token)
@@ -0,0 +1,73 @@
+"""Process-wide token buckets that pace OpenRouter requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """Allow ``rate_per_minute`` requests per minute with bursts up to that.
+
+    Callers reserve a token under a lock and then sleep off any deficit
+    outside it, so one bucket paces the event loops of every client that
+    shares it without blocking any of them.
+    """
+
+    def __init__(self, rate_per_minute: int) -> None:
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self._reserve())
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for ``seconds`` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until,
+                time.monotonic() + seconds,
+            )
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            # Tokens may go negative: each caller queues behind the deficit.
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            return max(wait, self._paused_until - now)
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(api_key: str, model_id: str, rate_per_minute: int) -> TokenBucket:
+    """Return the bucket shared by every client using this key and model."""
+    key = (api_key, model_id)
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None or bucket.capacity != rate_per_minute:
+            bucket = _buckets[key] = TokenBucket(rate_per_minute)
+        return bucket
+
+
+def retry_after_seconds(value: Optional[str]) -> float:
+    """Parse a ``Retry-After`` header given in seconds."""
+    try:
+        return max(0.0, float(value)) if value else DEFAULT_RETRY_AFTER
+    except ValueError:  # HTTP-date form; OpenRouter sends seconds
+        return DEFAULT_RETRY_AFTER
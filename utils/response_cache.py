@@ -0,0 +1,300 @@
+"""Local exact + semantic cache for OpenRouter chat completions."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+import msgspec
+import numpy as np
+
+try:  # The semantic layer is optional; exact-match caching needs only numpy
+    from sentence_transformers import SentenceTransformer  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    SentenceTransformer = None
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/ai_content_optimizer")
+# Exact entries are evicted least-recently-used past this many.
+DEFAULT_MAX_ENTRIES = 2048
+# Each semantic partition is a fixed-size ring; the oldest entry is replaced.
+PARTITION_CAPACITY = 256
+
+_ENCODER = msgspec.json.Encoder()
+
+
+class _CachedResponse(msgspec.Struct):
+    model: str
+    content: str
+    usage: Dict[str, int] = msgspec.field(default_factory=dict)
+
+
+class _SavedPartition(msgspec.Struct):
+    responses: List[_CachedResponse]
+    # Digest of the matching .npy rows, so a crash between the two writes
+    # cannot pair embeddings with the wrong responses.
+    embeddings_digest: str
+
+
+class _CacheFile(msgspec.Struct):
+    exact: Dict[str, _CachedResponse] = msgspec.field(default_factory=dict)
+    semantic: Dict[str, _SavedPartition] = msgspec.field(default_factory=dict)
+
+
+_FILE_DECODER = msgspec.json.Decoder(_CacheFile)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class _Partition:
+    """Preallocated ring of embeddings so inserts never copy the store."""
+
+    __slots__ = ("embeddings", "responses", "size", "next")
+
+    def __init__(self, dim: int) -> None:
+        self.embeddings = np.zeros((PARTITION_CAPACITY, dim), dtype=np.float32)
+        self.responses: List[Optional[_CachedResponse]] = (
+            [None] * PARTITION_CAPACITY
+        )
+        self.size = 0
+        self.next = 0
+
+    def add(self, embedding: np.ndarray, response: _CachedResponse) -> None:
+        self.embeddings[self.next] = embedding
+        self.responses[self.next] = response
+        self.next = (self.next + 1) % PARTITION_CAPACITY
+        self.size = min(self.size + 1, PARTITION_CAPACITY)
+
+    # Saved oldest first, so a reload keeps the eviction order.
+    def _order(self) -> List[int]:
+        if self.size < PARTITION_CAPACITY:
+            return list(range(self.size))
+        return [*range(self.next, self.size), *range(self.next)]
+
+    def ordered_rows(self) -> np.ndarray:
+        return self.embeddings[self._order()]
+
+    def ordered_responses(self) -> List[_CachedResponse]:
+        return [self.responses[index] for index in self._order()]
+
+    def best(self, query: np.ndarray):
+        scores = self.embeddings[:self.size] @ query
+        index = int(np.argmax(scores))
+        return float(scores[index]), self.responses[index]
+
+
+class SemanticCache:
+    """Return stored responses for repeated or near-identical requests.
+
+    Exact hits are a dict lookup on a hash of the whole request. With
+    ``semantic=True`` misses fall through to cosine similarity over
+    embeddings of the non-system messages. That layer is off by default:
+    the prompt is the paragraph being rewritten, so a near match can return
+    the rewrite of different text.
+    Semantic entries are partitioned by everything else in the request
+    (model, system prompt, sampling parameters). Every agent shares the same
+    long style-guide prefix, so comparing whole prompts would match almost
+    anything.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        threshold: float = 0.92,
+        semantic: bool = False,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.semantic = semantic
+        self.max_entries = max_entries
+        self._exact: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._partitions: Dict[str, _Partition] = {}
+        self._embedder = None
+        # Only what changed since the last save is rewritten.
+        self._exact_dirty = False
+        self._dirty_partitions: Set[str] = set()
+        self._saved_digests: Dict[str, str] = {}
+        # The cache is shared across Streamlit sessions and worker threads.
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic and SentenceTransformer is not None
+
+    def get(self, request) -> Optional[_CachedResponse]:
+        exact_key, partition, query = self._keys(request)
+        with self._lock:
+            hit = self._exact.get(exact_key)
+            if hit is not None:
+                self._exact.move_to_end(exact_key)
+                return hit
+            if not self.semantic_enabled or partition not in self._partitions:
+                return None
+
+        embedding = self._embed(query)
+        with self._lock:
+            score, response = self._partitions[partition].best(embedding)
+        return response if score >= self.threshold else None
+
+    def put(self, request, response) -> None:
+        exact_key, partition, query = self._keys(request)
+        entry = _CachedResponse(
+            model=response.model,
+            content=response.content,
+            usage=dict(response.usage),
+        )
+        embedding = self._embed(query) if self.semantic_enabled else None
+        with self._lock:
+            self._exact[exact_key] = entry
+            self._exact.move_to_end(exact_key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+            self._exact_dirty = True
+            if embedding is None:
+                return
+            store = self._partitions.get(partition)
+            if store is None:
+                store = self._partitions[partition] = _Partition(len(embedding))
+            store.add(embedding, entry)
+            self._dirty_partitions.add(partition)
+
+    def save(self) -> None:
+        """Write the cache to ``cache_dir`` so later sessions start warm."""
+        with self._save_lock:
+            with self._lock:
+                if not (self._exact_dirty or self._dirty_partitions):
+                    return
+                exact = dict(self._exact)
+                changed = {}
+                for name in self._dirty_partitions:
+                    rows = changed[name] = self._partitions[name].ordered_rows()
+                    self._saved_digests[name] = _digest(rows.tobytes())
+                semantic = {
+                    name: _SavedPartition(
+                        responses=self._partitions[name].ordered_responses(),
+                        embeddings_digest=digest,
+                    )
+                    for name, digest in self._saved_digests.items()
+                }
+                self._exact_dirty = False
+                self._dirty_partitions.clear()
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for name, rows in changed.items():
+                self._write_atomic(
+                    self._embedding_path(name),
+                    lambda handle, rows=rows: np.save(handle, rows),
+                )
+            snapshot = _CacheFile(exact=exact, semantic=semantic)
+            self._write_atomic(
+                os.path.join(self.cache_dir, "responses.json"),
+                lambda handle: handle.write(_ENCODER.encode(snapshot)),
+            )
+
+    def _write_atomic(self, path: str, write: Callable) -> None:
+        # A unique temp file per write, renamed over the target in one step,
+        # so readers never see a partial file and writers never collide.
+        handle = tempfile.NamedTemporaryFile(
+            dir=self.cache_dir,
+            prefix=".tmp-",
+            delete=False,
+        )
+        try:
+            with handle:
+                write(handle)
+            os.replace(handle.name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(handle.name)
+            raise
+
+    def _load(self) -> None:
+        path = os.path.join(self.cache_dir, "responses.json")
+        try:
+            with open(path, "rb") as handle:
+                snapshot = _FILE_DECODER.decode(handle.read())
+        except (OSError, msgspec.DecodeError):
+            return
+
+        self._exact = OrderedDict(snapshot.exact)
+        while len(self._exact) > self.max_entries:
+            self._exact.popitem(last=False)
+        for name, saved in snapshot.semantic.items():
+            try:
+                rows = np.load(self._embedding_path(name))
+            except (OSError, ValueError, EOFError):
+                # Missing or truncated embeddings only cost this partition.
+                continue
+            if (
+                rows.ndim != 2
+                or rows.dtype != np.float32
+                or len(rows) != len(saved.responses)
+                or _digest(rows.tobytes()) != saved.embeddings_digest
+            ):
+                continue
+            store = _Partition(rows.shape[1])
+            for row, response in zip(
+                rows[-PARTITION_CAPACITY:],
+                saved.responses[-PARTITION_CAPACITY:],
+            ):
+                store.add(row, response)
+            self._partitions[name] = store
+            self._saved_digests[name] = saved.embeddings_digest
+
+    def _embedding_path(self, partition: str) -> str:
+        return os.path.join(self.cache_dir, f"{partition}.npy")
+
+    def _keys(self, request):
+        system = [m for m in request.messages if m.role == "system"]
+        prompt = [m.content for m in request.messages if m.role != "system"]
+        exact_key = _digest(_ENCODER.encode(request))
+        partition = _digest(
+            _ENCODER.encode(msgspec.structs.replace(request, messages=system))
+        )
+        return exact_key, partition, "\n\n".join(prompt)
+
+    def _embed(self, text: str) -> np.ndarray:
+        if self._embedder is None:
+            self._embedder = SentenceTransformer(EMBEDDING_MODEL)
+        # Normalized vectors make the dot product a cosine similarity.
+        return self._embedder.encode(
+            text,
+            normalize_embeddings=True,
+        ).astype(np.float32)
+
+
+_caches: Dict[str, SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    threshold: float = 0.92,
+    semantic: bool = False,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+) -> SemanticCache:
+    """Return the one cache per directory shared by every client.
+
+    Each client saving its own snapshot would overwrite the others' entries,
+    so the first caller's settings configure the shared instance.
+    """
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = _caches[cache_dir] = SemanticCache(
+                cache_dir=cache_dir,
+                threshold=threshold,
+                semantic=semantic,
+                max_entries=max_entries,
+            )
+        return cache
@@ -0,0 +1,222 @@
+"""Sentence and passive-voice scanning with optional Numba/Hyperscan backends."""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+try:  # Hyperscan is optional; the stdlib ``re`` fallback covers the same rules
+    import hyperscan  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    hyperscan = None
+
+try:  # Numba is optional; it compiles the sentence-boundary kernel below
+    import numba  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    numba = None
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+PASSIVE_RE = re.compile(
+    r"\b(?:be|been|being|is|was|were)\s+\w+ed\b",
+    re.IGNORECASE,
+)
+
+# Hyperscan has no lookbehind, so a sentence boundary is matched as the
+# terminator plus one whitespace character and the text is cut right after
+# the terminator; stripping each piece then drops the rest of the run.
+# Hyperscan's ``\s`` (with or without UCP) is not the set ``re`` uses for str
+# patterns, so the whitespace class spells out exactly the characters that
+# ``re``'s ``\s`` matches.
+_BOUNDARY_PATTERN = (
+    rb"[.!?][\x{9}-\x{d}\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}"
+    rb"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]"
+)
+# Hyperscan rejects ``\b`` under UCP, so the passive database uses ASCII word
+# rules and only ever see ASCII sentences (the rest go through ``re``); for
+# ASCII input this pattern matches exactly what PASSIVE_RE does.
+_PASSIVE_PATTERN = rb"\b(?:be|been|being|is|was|were)[\t-\r\x1c- ]+\w+ed\b"
+
+# Hyperscan scratch space is not thread-safe and Streamlit serves each
+# session from its own thread, so every thread compiles its own databases.
+_local = threading.local()
+
+
+def _compile(pattern: bytes, flags: int):
+    database = hyperscan.Database()
+    database.compile(expressions=[pattern], ids=[0], elements=1, flags=flags)
+    return database
+
+
+def _databases():
+    if hyperscan is None:
+        return None
+    if not hasattr(_local, "passive_all"):
+        _local.passive_all = _compile(
+            _PASSIVE_PATTERN,
+            hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST,
+        )
+        _local.boundary = _compile(
+            _BOUNDARY_PATTERN,
+            hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SOM_LEFTMOST,
+        )
+    return _local
+
+
+def _boundary_offsets(buf: np.ndarray) -> np.ndarray:
+    """Return the offset just past every terminator followed by whitespace.
+
+    ``buf`` holds UTF-8 bytes. The byte checks mirror ``_BOUNDARY_PATTERN``:
+    ASCII whitespace, then the two- and three-byte encodings of the
+    non-ASCII characters in ``re``'s ``\\s``.
+    """
+    size = buf.shape[0]
+    cuts = np.empty(size, dtype=np.int64)
+    count = 0
+    for index in range(size - 1):
+        byte = buf[index]
+        if byte != 46 and byte != 33 and byte != 63:  # . ! ?
+            continue
+        lead = buf[index + 1]
+        if (9 <= lead <= 13) or (28 <= lead <= 32):
+            is_space = True
+        elif index + 2 >= size:
+            is_space = False
+        elif lead == 0xC2:
+            is_space = buf[index + 2] == 0x85 or buf[index + 2] == 0xA0
+        elif index + 3 >= size:
+            is_space = False
+        else:
+            second = buf[index + 2]
+            third = buf[index + 3]
+            if lead == 0xE1:
+                is_space = second == 0x9A and third == 0x80
+            elif lead == 0xE2 and second == 0x80:
+                is_space = (
+                    third <= 0x8A or third == 0xA8 or third == 0xA9 or third == 0xAF
+                )
+            elif lead == 0xE2:
+                is_space = second == 0x81 and third == 0x9F
+            elif lead == 0xE3:
+                is_space = second == 0x80 and third == 0x80
+            else:
+                is_space = False
+        if is_space:
+            cuts[count] = index + 1
+            count += 1
+    return cuts[:count]
+
+
+if numba is not None:
+    _boundary_offsets = numba.njit(cache=True, nogil=True)(_boundary_offsets)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split on whitespace that follows ``.``, ``!`` or ``?``."""
+    databases = None if numba is not None else _databases()
+    if numba is None and databases is None:
+        pieces = SENTENCE_SPLIT_RE.split(text)
+    else:
+        data = text.encode("utf-8")
+        if numba is not None:
+            cuts = _boundary_offsets(np.frombuffer(data, dtype=np.uint8)).tolist()
+        else:
+            cuts = []
+            databases.boundary.scan(
+                data,
+                match_event_handler=lambda _id, start, _end, _flags, _ctx: cuts.append(
+                    start + 1
+                ),
+            )
+        # Every cut sits right after an ASCII terminator byte, so each slice
+        # is valid UTF-8 on its own.
+        bounds = [0, *cuts, len(data)]
+        pieces = [
+            data[start:end].decode("utf-8")
+            for start, end in zip(bounds, bounds[1:])
+        ]
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+# Per-block character budget for rewrite prompts (~1k tokens).
+MAX_LLM_CHARS = 4000
+
+
+def split_for_llm(text: str, max_chars: int = MAX_LLM_CHARS) -> Tuple[str, str]:
+    """Split ``text`` into a prompt-sized head and the untouched tail.
+
+    The head is the longest run of whole leading sentences within
+    ``max_chars``; a first sentence that alone exceeds the budget is cut at
+    its last space before the limit. ``head + tail == text``, so callers can
+    rewrite the head and re-attach the tail without losing content.
+    """
+    if len(text) <= max_chars:
+        return text, ""
+    cut = 0
+    pos = 0
+    for sentence in split_sentences(text):
+        # Sentences are stripped slices of ``text``, in order.
+        end = text.index(sentence, pos) + len(sentence)
+        if end > max_chars:
+            break
+        cut = pos = end
+    if not cut:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+    return text[:cut], text[cut:]
+
+
+def word_count(text: str) -> int:
+    """Count words as spaces + 1 without allocating a list of pieces.
+
+    Blocks and sentences arrive stripped with single-spaced words, so this
+    matches ``len(text.split())`` for them; doubled spaces over-count, which
+    the length heuristics tolerate.
+    """
+    return text.count(" ") + 1 if text else 0
+
+
+def passive_mask(sentences: Sequence[str]) -> np.ndarray:
+    """Flag passive sentences with one scan over the whole batch.
+
+    Sentences are joined with NUL separators, which neither ``\\s`` nor
+    ``\\w`` match, so no hit can span two sentences. Each hit's start offset
+    is mapped back to its sentence with a binary search over the ends.
+    """
+    mask = np.zeros(len(sentences), dtype=bool)
+    if not sentences:
+        return mask
+
+    databases = _databases()
+    if databases is None:
+        lengths = [len(sentence) + 1 for sentence in sentences]
+        starts = [
+            match.start()
+            for match in PASSIVE_RE.finditer("\x00".join(sentences))
+        ]
+    else:
+        # Non-ASCII sentences leave an empty slot in the buffer and are
+        # checked with ``re`` below.
+        ascii_flags = [sentence.isascii() for sentence in sentences]
+        encoded = [
+            sentence.encode("ascii") if is_ascii else b""
+            for sentence, is_ascii in zip(sentences, ascii_flags)
+        ]
+        lengths = [len(data) + 1 for data in encoded]
+        starts = []
+        databases.passive_all.scan(
+            b"\x00".join(encoded),
+            match_event_handler=lambda _id, start, _end, _flags, _ctx: starts.append(
+                start
+            ),
+        )
+        for index, is_ascii in enumerate(ascii_flags):
+            if not is_ascii:
+                mask[index] = bool(PASSIVE_RE.search(sentences[index]))
+    if starts:
+        ends = np.cumsum(lengths)
+        mask[np.searchsorted(ends, starts, side="right")] = True
+    return mask